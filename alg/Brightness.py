@@ -1,7 +1,9 @@
 import numpy as np
 from PIL import Image
+from alg._buffers import store
+from alg._lut import POINT_OPERATIONS
 
-def Brightness(image, factor=1.0):
+def Brightness(image, factor=1.0, out=None):
     """
     Adjust the brightness of an image
     Args:
@@ -9,15 +11,20 @@ def Brightness(image, factor=1.0):
         factor: Brightness factor (default: 1.0)
                Values > 1.0 increase brightness
                Values < 1.0 decrease brightness
+        out: uint8 array of the image's shape to write the result into
     """
     # Convert to numpy array if needed
     if isinstance(image, Image.Image):
-        image = np.array(image)
+        image = np.asarray(image)
     
+    # uint8 levels map through a table, without a float image in between
+    if image.dtype == np.uint8:
+        return np.take(POINT_OPERATIONS["Brightness"](None, factor=factor), image, out=out, mode='clip')
+
     # Apply brightness adjustment
     brightened = image * factor
     
     # Clip values to valid range
-    brightened = np.clip(brightened, 0, 255).astype(np.uint8)
+    np.clip(brightened, 0, 255, out=brightened)
     
-    return brightened
\ No newline at end of file
+    return store(brightened, out)
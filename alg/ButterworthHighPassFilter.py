@@ -1,6 +1,5 @@
-import numpy as np
-from scipy.fft import fft2, ifft2
 from PIL import Image
+from alg._transfer import spectrum_transfer_function
 
 def ButterworthHighPassFilter(image, cutoff=30, order=2):
     """
@@ -15,20 +14,8 @@ def ButterworthHighPassFilter(image, cutoff=30, order=2):
     if isinstance(image, Image.Image):
         raise ValueError("Expected frequency domain data, got PIL Image")
     
-    # Get image dimensions
-    rows, cols = image.shape
-    crow, ccol = rows // 2, cols // 2
-    
-    # Create meshgrid for filter
-    u = np.arange(rows)
-    v = np.arange(cols)
-    u, v = np.meshgrid(u - crow, v - ccol, indexing='ij')
-    
-    # Calculate distances
-    D = np.sqrt(u**2 + v**2)
-    
-    # Create Butterworth high-pass filter
-    H = 1 / (1 + (cutoff / (D + 1e-6))**(2 * order))
+    # Get the cached Butterworth high-pass filter for this spectrum layout
+    H = spectrum_transfer_function("ButterworthHighPassFilter", image, cutoff=cutoff, order=order)
     
     # Apply filter to frequency domain data
     return image * H
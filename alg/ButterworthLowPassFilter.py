@@ -1,5 +1,5 @@
-import numpy as np
 from PIL import Image
+from alg._transfer import spectrum_transfer_function
 
 def ButterworthLowPassFilter(image, cutoff=30, order=2):
     """
@@ -14,19 +14,8 @@ def ButterworthLowPassFilter(image, cutoff=30, order=2):
     if isinstance(image, Image.Image):
         raise ValueError("Expected frequency domain data, got PIL Image")
     
-    rows, cols = image.shape
-    crow, ccol = rows // 2, cols // 2
-    
-    # Create meshgrid for filter
-    u = np.arange(rows)
-    v = np.arange(cols)
-    u, v = np.meshgrid(u - crow, v - ccol, indexing='ij')
-    
-    # Calculate distances
-    D = np.sqrt(u**2 + v**2)
-    
-    # Create Butterworth low-pass filter
-    H = 1 / (1 + (D / cutoff)**(2 * order))
+    # Get the cached Butterworth low-pass filter for this spectrum layout
+    H = spectrum_transfer_function("ButterworthLowPassFilter", image, cutoff=cutoff, order=order)
     
     # Apply filter to frequency domain data
     return image * H
\ No newline at end of file
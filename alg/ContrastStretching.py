@@ -1,18 +1,34 @@
 import numpy as np
 from PIL import Image
+from alg._histogram import apply_table, stretch_table
+from alg._stats import ImageStats
+from profiling import copies
 
-def ContrastStretching(image, low_percentile=2, high_percentile=98):
+def ContrastStretching(image, low_percentile=2, high_percentile=98, stats=None):
     """
     Apply contrast stretching to an image
     Args:
         image: Input image
         low_percentile: Lower percentile for stretching (default: 2)
         high_percentile: Upper percentile for stretching (default: 98)
+        stats: ImageStats of the image, whose histograms are reused
     """
     # Convert to numpy array if needed
     if isinstance(image, Image.Image):
-        image = np.array(image)
+        image = np.asarray(image)
     
+    # uint8 channels are stretched through a table built from their histogram
+    if image.dtype == np.uint8:
+        if stats is None:
+            stats = ImageStats(image)
+        if len(image.shape) == 3:
+            stretched = np.empty_like(image)
+            for channel in range(image.shape[2]):
+                table = stretch_table(stats.histogram(channel), low_percentile, high_percentile)
+                apply_table(table, image[:,:,channel], out=stretched[:,:,channel])
+            return stretched
+        return apply_table(stretch_table(stats.histogram(), low_percentile, high_percentile), image)
+
     # Handle RGB images
     if len(image.shape) == 3:
         stretched = np.zeros_like(image)
@@ -23,6 +39,7 @@ def ContrastStretching(image, low_percentile=2, high_percentile=98):
     else:
         stretched = stretch_channel(image, low_percentile, high_percentile)
     
+    copies.record("ContrastStretching.astype")
     return stretched.astype(np.uint8)
 
 def stretch_channel(channel, low_percentile, high_percentile):
@@ -1,14 +1,21 @@
 import numpy as np
 from PIL import Image
+from alg._noise import add_noise
 
-def ExponentialNoise(image, scale=1.0):
+def ExponentialNoise(image, scale=1.0, seed=None, origin=(0, 0), out=None):
     """
     Add exponential noise to an image
     Args:
         image: Input image
         scale: Scale parameter for exponential distribution
+        seed: Seed of the noise, for a repeatable result (default: drawn from np.random)
+        origin: (row, column) of the image when it is a tile of a larger one, whose
+                noise it then shares (default: (0, 0))
+        out: uint8 array of the image's shape to write the result into
     """
-    noise = np.random.exponential(scale=scale, size=image.shape)
-    noisy_image = np.array(image, dtype=np.float32) + noise
-    noisy_image = np.clip(noisy_image, 0, 255)
-    return noisy_image.astype(np.uint8)
\ No newline at end of file
+    # Convert to numpy array if needed
+    if isinstance(image, Image.Image):
+        image = np.asarray(image)
+
+    # Draw float32 noise block by block from seeded streams, adding the image in place
+    return add_noise(image, "exponential", seed, out, origin, scale=scale)
@@ -1,12 +1,16 @@
 import numpy as np
 from PIL import Image
-from scipy.fft import fft2, fftshift
+from scipy.fft import fft2, fftshift, rfft2
+from alg._spectrum import HalfSpectrum, display_spectrum
+from profiling import copies
 
-def FourierTransform(image):
+def FourierTransform(image, half_spectrum=False):
     """
     Apply Fourier Transform to an image and return the magnitude spectrum and phase
     Args:
         image: Input image (PIL Image or numpy array)
+        half_spectrum: Use a real-input rfft2 and keep only the non-redundant
+                       half-plane as complex64 (default: False)
     Returns:
         tuple: (magnitude spectrum for display, complex frequency domain for inverse transform)
     """
@@ -14,25 +18,24 @@ def FourierTransform(image):
     if isinstance(image, Image.Image):
         if image.mode != 'L':
             image = image.convert('L')
-        img_array = np.array(image)
+        img_array = np.asarray(image)
     else:
         img_array = image
         if len(img_array.shape) > 2:
             # Convert RGB to grayscale using standard weights
             img_array = np.dot(img_array[...,:3], [0.2989, 0.5870, 0.1140])
-    
+
+    copies.record("FourierTransform.astype")
     img_array = img_array.astype(np.float32)
-    
-    # Apply FFT and shift
-    f_transform = fft2(img_array)
-    f_shift = fftshift(f_transform)
-    
-    # Calculate magnitude spectrum for display
-    magnitude_spectrum = np.log(np.abs(f_shift) + 1)
-    
-    # Normalize to 0-255 range for display
-    display_spectrum = ((magnitude_spectrum - magnitude_spectrum.min()) * 255
-                       / (magnitude_spectrum.max() - magnitude_spectrum.min()))
-    
+
+    if half_spectrum:
+        # Real input: rfft2 computes only columns 0..cols // 2, shift rows only
+        f_half = fftshift(rfft2(img_array), axes=0).astype(np.complex64, copy=False)
+        f_shift = HalfSpectrum(f_half, img_array.shape)
+    else:
+        # Apply FFT and shift
+        f_transform = fft2(img_array)
+        f_shift = fftshift(f_transform)
+
     # Return both display spectrum and the complex frequency domain
-    return display_spectrum.astype(np.uint8), f_shift
\ No newline at end of file
+    return display_spectrum(f_shift), f_shift
@@ -1,5 +1,6 @@
 import numpy as np
 from PIL import Image
+from profiling import copies
 
 def GammaCorrection(image, gamma=1.0):
     """
@@ -7,18 +8,24 @@ def GammaCorrection(image, gamma=1.0):
     Args:
         image: Input image
         gamma: Gamma value (default: 1.0)
+    Returns:
+        numpy.ndarray: Corrected uint8 image
     """
     # Convert to numpy array if needed
     if isinstance(image, Image.Image):
-        image = np.array(image)
+        image = np.asarray(image)
     
     # Normalize to 0-1 range
+    copies.record("GammaCorrection.astype")
     normalized = image.astype(np.float32) / 255.0
     
     # Apply gamma correction
     corrected = np.power(normalized, gamma)
     
     # Convert back to 0-255 range
-    corrected = np.clip(corrected * 255.0, 0, 255).astype(np.uint8)
+    corrected *= 255.0
+    np.clip(corrected, 0, 255, out=corrected)
+    copies.record("GammaCorrection.astype")
+    corrected = corrected.astype(np.uint8)
     
-    return Image.fromarray(corrected)
+    return corrected
@@ -1,6 +1,8 @@
 import numpy as np
 from scipy.fft import fft2, ifft2
 from PIL import Image
+from alg._transfer import transfer_function, spectrum_transfer_function
+from profiling import copies
 
 def GaussianHighPassFilter(image, sigma=30):
     """
@@ -9,27 +11,22 @@ def GaussianHighPassFilter(image, sigma=30):
         image: Input image
         sigma: Standard deviation of Gaussian filter (default: 30)
     """
+    # Frequency domain data from FourierTransform is filtered directly
+    if isinstance(image, np.ndarray) and np.iscomplexobj(image):
+        return GaussianHighPassFilterFreq(image, sigma)
+
     # Convert to grayscale if needed
     if isinstance(image, Image.Image):
         image = image.convert('L')
-        image = np.array(image)
+        image = np.asarray(image)
     elif isinstance(image, np.ndarray) and len(image.shape) == 3:
         # Convert RGB to grayscale using weighted sum
         image = np.dot(image[...,:3], [0.2989, 0.5870, 0.1140])
     
     rows, cols = image.shape
-    crow, ccol = rows // 2, cols // 2
-    
-    # Create meshgrid for filter
-    u = np.arange(rows)
-    v = np.arange(cols)
-    u, v = np.meshgrid(u - crow, v - ccol, indexing='ij')
     
-    # Calculate distances
-    D = np.sqrt(u**2 + v**2)
-    
-    # Create Gaussian high-pass filter
-    H = 1 - np.exp(-(D**2) / (2 * sigma**2))
+    # Get the cached Gaussian high-pass filter
+    H = transfer_function("GaussianHighPassFilter", (rows, cols), sigma=sigma)
     
     # Apply filter in frequency domain
     F = fft2(image)
@@ -40,8 +37,10 @@ def GaussianHighPassFilter(image, sigma=30):
     # Inverse transform
     filtered_image = np.real(ifft2(G))
     
-    # Normalize and convert to uint8
-    filtered_image = np.clip(filtered_image, 0, 255).astype(np.uint8)
+    # Normalize in place and convert to uint8
+    np.clip(filtered_image, 0, 255, out=filtered_image)
+    copies.record("GaussianHighPassFilter.astype")
+    filtered_image = filtered_image.astype(np.uint8)
     
     return filtered_image
 
@@ -57,19 +56,8 @@ def GaussianHighPassFilterFreq(image, sigma=1.0):
     if isinstance(image, Image.Image):
         raise ValueError("Expected frequency domain data, got PIL Image")
     
-    rows, cols = image.shape
-    crow, ccol = rows // 2, cols // 2
-    
-    # Create meshgrid for filter
-    u = np.arange(rows)
-    v = np.arange(cols)
-    u, v = np.meshgrid(u - crow, v - ccol, indexing='ij')
-    
-    # Calculate distances
-    D = np.sqrt(u**2 + v**2)
-    
-    # Create Gaussian high-pass filter
-    H = 1 - np.exp(-(D**2) / (2 * sigma**2))
+    # Get the cached Gaussian high-pass filter for this spectrum layout
+    H = spectrum_transfer_function("GaussianHighPassFilter", image, sigma=sigma)
     
     # Apply filter to frequency domain data
     return image * H
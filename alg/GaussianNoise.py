@@ -1,26 +1,25 @@
 import numpy as np
 from PIL import Image
+from alg._noise import add_noise
 
-def GaussianNoise(image, mean=0, sigma=25):
+def GaussianNoise(image, mean=0, sigma=25, seed=None, origin=(0, 0), out=None):
     """
     Add Gaussian noise to an image
     Args:
         image: Input image
         mean: Mean of the Gaussian distribution (default: 0)
         sigma: Standard deviation of the Gaussian distribution (default: 25)
+        seed: Seed of the noise, for a repeatable result (default: drawn from np.random)
+        origin: (row, column) of the image when it is a tile of a larger one, whose
+                noise it then shares (default: (0, 0))
+        out: uint8 array of the image's shape to write the result into
     """
     # Convert to numpy array if needed
     if isinstance(image, Image.Image):
-        # Ensure image is in RGB mode
-        if image.mode != 'RGB':
+        # Ensure image is in RGB mode, keeping grayscale single-channel
+        if image.mode not in ('RGB', 'L'):
             image = image.convert('RGB')
-        image = np.array(image)
+        image = np.asarray(image)
     
-    # Generate noise with same shape as image
-    noise = np.random.normal(mean * 255, sigma * 255, image.shape)
-    
-    # Add noise and clip values
-    noisy_image = image.astype(np.float32) + noise
-    noisy_image = np.clip(noisy_image, 0, 255).astype(np.uint8)
-    
-    return noisy_image
+    # Draw float32 noise block by block from seeded streams, adding the image in place
+    return add_noise(image, "gaussian", seed, out, origin, mean=mean, sigma=sigma)
@@ -1,5 +1,6 @@
 import numpy as np
 from PIL import Image
+from profiling import copies
 
 def Gray2Binary(image, threshold=127):
     """
@@ -10,13 +11,14 @@ def Gray2Binary(image, threshold=127):
     """
     # Convert to numpy array if needed
     if isinstance(image, Image.Image):
-        image = np.array(image)
+        image = np.asarray(image)
     
     # Convert RGB to grayscale if needed
     if len(image.shape) == 3:
         image = np.dot(image[...,:3], [0.2989, 0.5870, 0.1140])
     
     # Convert to binary
+    copies.record("Gray2Binary.astype")
     binary = (image > threshold).astype(np.uint8) * 255
     
     return binary
@@ -1,16 +1,32 @@
 import numpy as np
 from PIL import Image
+from alg._histogram import apply_table, equalize_table
+from alg._stats import ImageStats
+from profiling import copies
 
-def Histogram(image):
+def Histogram(image, stats=None):
     """
     Apply histogram equalization to an image
     Args:
         image: Input image
+        stats: ImageStats of the image, whose histograms are reused
     """
     # Convert to numpy array if needed
     if isinstance(image, Image.Image):
-        image = np.array(image)
+        image = np.asarray(image)
     
+    # uint8 channels map through their equalization table, built from their histogram
+    if image.dtype == np.uint8:
+        if stats is None:
+            stats = ImageStats(image)
+        if len(image.shape) == 3:
+            equalized = np.empty_like(image)
+            for channel in range(image.shape[2]):
+                apply_table(equalize_table(stats.histogram(channel)), image[:,:,channel],
+                            out=equalized[:,:,channel])
+            return equalized
+        return apply_table(equalize_table(stats.histogram()), image)
+
     # Handle RGB images
     if len(image.shape) == 3:
         # Apply histogram equalization to each channel
@@ -21,6 +37,7 @@ def Histogram(image):
         # Apply histogram equalization to grayscale image
         equalized = equalize_channel(image)
     
+    copies.record("Histogram.astype")
     return equalized.astype(np.uint8)
 
 def equalize_channel(channel):
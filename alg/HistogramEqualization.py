@@ -1,31 +1,43 @@
 import numpy as np
 from PIL import Image
+from alg._histogram import apply_table, histogram, scaled_cdf_table
+from profiling import copies
 
-def HistogramEqualization(image):
+def HistogramEqualization(image, stats=None):
     """
     Apply histogram equalization to an image
     Args:
         image: Input image
+        stats: ImageStats of the image; a grayscale image reuses its histogram
     """
     # Convert to numpy array if needed
     if isinstance(image, Image.Image):
-        image = np.array(image)
+        image = np.asarray(image)
     
     # Handle RGB images
     if len(image.shape) == 3:
-        # Convert to HSV for better equalization
+        # Convert to HSV for better equalization, through PIL and back twice
+        copies.record("HistogramEqualization.pil", 4)
         hsv = np.array(Image.fromarray(image).convert('HSV'))
         # Apply equalization to V channel
         hsv[:,:,2] = equalize_channel(hsv[:,:,2])
         # Convert back to RGB
         equalized = np.array(Image.fromarray(hsv, mode='HSV').convert('RGB'))
     else:
-        equalized = equalize_channel(image)
+        equalized = equalize_channel(image, stats)
     
-    return equalized.astype(np.uint8)
+    # Table lookups return uint8 already, and only other dtypes are converted
+    if equalized.dtype != np.uint8:
+        copies.record("HistogramEqualization.astype")
+    return equalized.astype(np.uint8, copy=False)
 
-def equalize_channel(channel):
+def equalize_channel(channel, stats=None):
     """Helper function to equalize a single channel"""
+    # uint8 channels map through a table built from their histogram
+    if channel.dtype == np.uint8:
+        hist = stats.histogram() if stats is not None else histogram(channel)
+        return apply_table(scaled_cdf_table(hist), channel)
+
     # Calculate histogram
     hist, bins = np.histogram(channel.flatten(), 256, [0, 256])
     
@@ -1,5 +1,5 @@
-import numpy as np
 from PIL import Image
+from alg._transfer import spectrum_transfer_function
 
 def IdealHighPassFilter(image, cutoff=30):
     """
@@ -13,19 +13,8 @@ def IdealHighPassFilter(image, cutoff=30):
     if isinstance(image, Image.Image):
         raise ValueError("Expected frequency domain data, got PIL Image")
     
-    rows, cols = image.shape
-    crow, ccol = rows // 2, cols // 2
-    
-    # Create meshgrid for filter
-    u = np.arange(rows)
-    v = np.arange(cols)
-    u, v = np.meshgrid(u - crow, v - ccol, indexing='ij')
-    
-    # Calculate distances
-    D = np.sqrt(u**2 + v**2)
-    
-    # Create ideal high-pass filter
-    H = (D > cutoff).astype(float)
+    # Get the cached ideal high-pass filter for this spectrum layout
+    H = spectrum_transfer_function("IdealHighPassFilter", image, cutoff=cutoff)
     
     # Apply filter to frequency domain data
     return image * H
@@ -1,25 +1,34 @@
 import numpy as np
-from scipy.fft import ifft2, ifftshift
+from scipy.fft import ifft2, ifftshift, irfft2
 from PIL import Image
+from alg._spectrum import is_half_spectrum
+from profiling import copies
 
 def InverseFourierTransform(freq_domain):
     """
     Apply Inverse Fourier Transform to a frequency domain image
     Args:
-        freq_domain: Input frequency domain data (complex array from FourierTransform)
+        freq_domain: Input frequency domain data (complex array from FourierTransform,
+                     full or half-plane layout)
     Returns:
         numpy.ndarray: Reconstructed spatial domain image
     """
     # No need to convert PIL Image since we expect complex array
     if isinstance(freq_domain, Image.Image):
         raise ValueError("Expected complex frequency domain array, got PIL Image")
-    
-    # Apply inverse FFT
-    f_ishift = ifftshift(freq_domain)
-    img_back = ifft2(f_ishift)
-    img_back = np.abs(img_back).real  # Take real part and magnitude
-    
-    # Normalize to original range
-    img_back = np.clip(img_back, 0, 255)
-    
+
+    if is_half_spectrum(freq_domain):
+        # Undo the row shift and let irfft2 restore the conjugate half
+        f_ishift = ifftshift(np.asarray(freq_domain), axes=0)
+        img_back = np.abs(irfft2(f_ishift, s=freq_domain.full_shape))
+    else:
+        # Apply inverse FFT
+        f_ishift = ifftshift(freq_domain)
+        img_back = ifft2(f_ishift)
+        img_back = np.abs(img_back).real  # Take real part and magnitude
+
+    # Normalize to original range, in place
+    np.clip(img_back, 0, 255, out=img_back)
+
+    copies.record("InverseFourierTransform.astype")
     return img_back.astype(np.uint8)
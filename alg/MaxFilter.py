@@ -1,24 +1,24 @@
 import numpy as np
 from PIL import Image
+from alg._buffers import filter_channels
+from alg._extrema import fits, running_maximum
 from scipy.ndimage import maximum_filter
 
-def MaxFilter(image, size=3):
+def MaxFilter(image, size=3, out=None):
     """
     Apply max filter to an image
     Args:
         image: Input image
         size: Size of the filter kernel (default: 3)
+        out: uint8 array of the image's shape to write the result into
     """
     # Convert to numpy array if needed
     if isinstance(image, Image.Image):
-        image = np.array(image)
+        image = np.asarray(image)
     
-    # Apply max filter to each channel if RGB
-    if len(image.shape) == 3:
-        filtered = np.zeros_like(image)
-        for channel in range(image.shape[2]):
-            filtered[:,:,channel] = maximum_filter(image[:,:,channel], size=size)
-    else:
-        filtered = maximum_filter(image, size=size)
-    
-    return filtered.astype(np.uint8)
+    # uint8 images take the running extrema engine, whose cost hardly grows with the window
+    if fits(image, size):
+        return running_maximum(image, size, out)
+
+    # Apply max filter to all channels at once if RGB
+    return filter_channels(maximum_filter, image, out, size=size)
@@ -1,24 +1,26 @@
 import numpy as np
 from PIL import Image
+from alg._buffers import filter_channels
+from alg._median import MIN_SIZE, histogram_median
 from scipy.ndimage import median_filter
 
-def MedianFilter(image, size=3):
+def MedianFilter(image, size=3, out=None):
     """
     Apply median filter to an image
     Args:
         image: Input image
         size: Size of the filter kernel (default: 3)
+        out: uint8 array of the image's shape to write the result into
     """
     # Convert to numpy array if needed
     if isinstance(image, Image.Image):
-        image = np.array(image)
+        image = np.asarray(image)
     
-    # Apply median filter to each channel if RGB
-    if len(image.shape) == 3:
-        filtered = np.zeros_like(image)
-        for channel in range(image.shape[2]):
-            filtered[:,:,channel] = median_filter(image[:,:,channel], size=size)
-    else:
-        filtered = median_filter(image, size=size)
-    
-    return filtered.astype(np.uint8)
+    # Larger windows on uint8 images take the histogram median, whose cost
+    # hardly grows with the window (windows wider than the image reflect
+    # differently, so those stay with scipy)
+    if image.dtype == np.uint8 and MIN_SIZE <= size <= min(image.shape[:2]):
+        return histogram_median(image, size, out)
+
+    # Apply median filter to all channels at once if RGB
+    return filter_channels(median_filter, image, out, size=size)
@@ -1,29 +1,38 @@
 import numpy as np
 from PIL import Image
-from scipy.ndimage import uniform_filter
+from alg._buffers import store
+from alg._extrema import fits, running_min_max
+from scipy.ndimage import maximum_filter, minimum_filter
+from profiling import copies
 
-def MidPointFilter(image, size=3):
+def MidPointFilter(image, size=3, out=None):
     """
     Apply midpoint filter to an image
     Args:
         image: Input image
         size: Filter window size
+        out: uint8 array of the image's shape to write the result into
     """
-    # Convert to float for calculations
-    img_float = np.array(image, dtype=np.float32)
-    
-    # Calculate local min and max using uniform filter
-    local_min = uniform_filter(np.minimum.reduce(img_float, axis=2 if len(img_float.shape) > 2 else None), size)
-    local_max = uniform_filter(np.maximum.reduce(img_float, axis=2 if len(img_float.shape) > 2 else None), size)
-    
-    # Calculate midpoint
-    result = (local_min + local_max) / 2
-    
+    # Convert to numpy array if needed
+    if isinstance(image, Image.Image):
+        image = np.asarray(image)
+
+    # Local min and max of each channel, from one padded copy through the extrema engine for uint8
+    if fits(image, size):
+        local_min, local_max = running_min_max(image, size)
+    else:
+        window = (size, size, 1) if image.ndim == 3 else size
+        local_min = minimum_filter(image, size=window)
+        local_max = maximum_filter(image, size=window)
+
+    # Calculate midpoint, rounding down like the uint8 conversion always did
+    if image.dtype == np.uint8:
+        if out is None:
+            out = np.empty_like(image)
+        copies.record("MidPointFilter.astype")
+        return np.floor_divide(local_min.astype(np.uint16) + local_max, 2, out=out, casting='unsafe')
+    copies.record("MidPointFilter.astype")
+    result = (local_min.astype(np.float32) + local_max) / 2
+
     # Convert back to uint8
-    result = np.clip(result, 0, 255).astype(np.uint8)
-    
-    # If input was RGB, broadcast result to all channels
-    if len(image.shape) > 2:
-        result = np.stack([result] * 3, axis=-1)
-    
-    return result
\ No newline at end of file
+    return store(np.clip(result, 0, 255), out)
@@ -1,5 +1,6 @@
 import numpy as np
 from PIL import Image
+from profiling import copies
 
 def Negative(image):
     """
@@ -9,9 +10,12 @@ def Negative(image):
     """
     # Convert to numpy array if needed
     if isinstance(image, Image.Image):
-        image = np.array(image)
+        image = np.asarray(image)
     
     # Invert the image
     negative = 255 - image
     
-    return negative.astype(np.uint8)
+    # 255 - uint8 is uint8 already, and only other dtypes are converted
+    if negative.dtype != np.uint8:
+        copies.record("Negative.astype")
+    return negative.astype(np.uint8, copy=False)
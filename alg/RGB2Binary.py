@@ -1,5 +1,6 @@
 import numpy as np
 from PIL import Image
+from profiling import copies
 
 def RGB2Binary(image, threshold=127):
     """
@@ -10,21 +11,20 @@ def RGB2Binary(image, threshold=127):
     """
     # Convert to numpy array if needed
     if isinstance(image, Image.Image):
-        # Ensure image is in RGB mode
-        if image.mode != 'RGB':
+        # Ensure image is in RGB mode, keeping grayscale single-channel
+        if image.mode not in ('RGB', 'L'):
             image = image.convert('RGB')
-        image = np.array(image)
+        image = np.asarray(image)
     
-    # Convert to grayscale first if RGB
+    # Convert to grayscale first if RGB; the binary result is single-channel
     if len(image.shape) == 3:
-        # Preserve dimensions for proper display
+        copies.record("RGB2Binary.astype")
         grayscale = np.dot(image[...,:3], [0.2989, 0.5870, 0.1140]).astype(np.uint8)
-        # Add back the channel dimension
-        grayscale = np.stack([grayscale] * 3, axis=-1)
     else:
         grayscale = image
     
     # Convert to binary
+    copies.record("RGB2Binary.astype")
     binary = np.where(grayscale > threshold, 255, 0).astype(np.uint8)
     
     return binary
@@ -1,26 +1,25 @@
 import numpy as np
 from PIL import Image
+from alg._noise import add_noise
 
-def RayleighNoise(image, scale=0.1):
+def RayleighNoise(image, scale=0.1, seed=None, origin=(0, 0), out=None):
     """
     Add Rayleigh noise to an image
     Args:
         image: Input image
         scale: Scale parameter for Rayleigh distribution (default: 0.1)
               Higher values create more intense noise
+        seed: Seed of the noise, for a repeatable result (default: drawn from np.random)
+        origin: (row, column) of the image when it is a tile of a larger one, whose
+                noise it then shares (default: (0, 0))
+        out: uint8 array of the image's shape to write the result into
     """
     # Convert to numpy array if needed
     if isinstance(image, Image.Image):
-        # Ensure image is in RGB mode
-        if image.mode != 'RGB':
+        # Ensure image is in RGB mode, keeping grayscale single-channel
+        if image.mode not in ('RGB', 'L'):
             image = image.convert('RGB')
-        image = np.array(image)
+        image = np.asarray(image)
     
-    # Generate Rayleigh noise
-    noise = np.random.rayleigh(scale * 255, image.shape)
-    
-    # Add noise and clip values
-    noisy_image = image.astype(np.float32) + noise
-    noisy_image = np.clip(noisy_image, 0, 255).astype(np.uint8)
-    
-    return noisy_image
\ No newline at end of file
+    # Draw float32 noise block by block from seeded streams, adding the image in place
+    return add_noise(image, "rayleigh", seed, out, origin, scale=scale)
@@ -1,5 +1,6 @@
 import numpy as np
 from PIL import Image
+from profiling import copies
 
 def Rgb2Gray(image):
     """
@@ -9,7 +10,7 @@ def Rgb2Gray(image):
     """
     # Convert to numpy array if needed
     if isinstance(image, Image.Image):
-        image = np.array(image)
+        image = np.asarray(image)
     
     # Check if image is already grayscale
     if len(image.shape) == 2:
@@ -18,4 +19,5 @@ def Rgb2Gray(image):
     # Convert to grayscale using weighted sum
     grayscale = np.dot(image[...,:3], [0.2989, 0.5870, 0.1140])
     
+    copies.record("Rgb2Gray.astype")
     return grayscale.astype(np.uint8)
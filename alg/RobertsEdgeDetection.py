@@ -1,44 +1,54 @@
 import numpy as np
 from PIL import Image
+from profiling import copies
 
 def RobertsEdgeDetection(image, threshold=30):
     """
     Apply Roberts edge detection to an image
     Args:
         image: Input image
-        threshold: Edge detection threshold (default: 30)
+        threshold: Edge detection threshold in percent of full scale (default: 30)
+    Returns:
+        numpy.ndarray: Binary uint8 edge map
     """
     # Convert to numpy array if needed
     if isinstance(image, Image.Image):
-        image = np.array(image)
-    
-    # Convert to grayscale if needed
-    if len(image.shape) == 3:
-        image = np.dot(image[...,:3], [0.2989, 0.5870, 0.1140])
-    
-    # Convert to float and normalize to [0, 1] range
-    image = image.astype(np.float32) / 255.0
-    
-    # Roberts operators
-    Gx = np.array([[1, 0],
-                   [0, -1]])
-    
-    Gy = np.array([[0, 1],
-                   [-1, 0]])
-    
-    rows, cols = image.shape
-    edges = np.zeros_like(image)
-    
-    # Apply Roberts operators
-    for i in range(rows - 1):
-        for j in range(cols - 1):
-            gx = np.sum(image[i:i+2, j:j+2] * Gx)
-            gy = np.sum(image[i:i+2, j:j+2] * Gy)
-            magnitude = np.sqrt(gx**2 + gy**2)
-            # Normalize threshold to [0, 1] range
-            norm_threshold = threshold / 100.0
-            edges[i, j] = 1.0 if magnitude > norm_threshold else 0.0
-    
-    # Convert back to [0, 255] range
-    edges = (edges * 255).astype(np.uint8)
-    return Image.fromarray(edges)
+        image = np.asarray(image)
+
+    # Grayscale intensities in float32, kept in the [0, 255] range
+    gray = to_gray_float32(image)
+    rows, cols = gray.shape
+
+    # Diagonal differences of the Roberts cross, written into preallocated buffers
+    gx = np.empty((max(rows - 1, 0), max(cols - 1, 0)), dtype=np.float32)
+    gy = np.empty_like(gx)
+    np.subtract(gray[:-1, :-1], gray[1:, 1:], out=gx)
+    np.subtract(gray[:-1, 1:], gray[1:, :-1], out=gy)
+
+    # Squared magnitude, computed in place
+    np.multiply(gx, gx, out=gx)
+    np.multiply(gy, gy, out=gy)
+    gx += gy
+
+    # Compare against the squared threshold so no sqrt is needed
+    norm_threshold = np.float32(threshold / 100.0 * 255.0)
+    edges = np.zeros((rows, cols), dtype=np.uint8)
+    edges[:-1, :-1] = gx > norm_threshold * norm_threshold
+    edges *= 255
+
+    return edges
+
+def to_gray_float32(image):
+    """Helper function to get a float32 grayscale copy of an image"""
+    if len(image.shape) == 2:
+        copies.record("RobertsEdgeDetection.astype")
+        return image.astype(np.float32)
+
+    # Weighted sum of the RGB channels without a float64 np.dot
+    gray = np.multiply(image[..., 0], np.float32(0.2989), dtype=np.float32)
+    tmp = np.empty_like(gray)
+    np.multiply(image[..., 1], np.float32(0.5870), out=tmp, dtype=np.float32)
+    gray += tmp
+    np.multiply(image[..., 2], np.float32(0.1140), out=tmp, dtype=np.float32)
+    gray += tmp
+    return gray
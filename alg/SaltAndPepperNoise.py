@@ -1,40 +1,40 @@
 import numpy as np
 from PIL import Image
+from alg._buffers import store
+from profiling import copies
 
-def SaltAndPepperNoise(image, prob=0.05):
+def SaltAndPepperNoise(image, prob=0.05, out=None):
     """
     Add salt and pepper noise to an image
     Args:
         image: Input image
         prob: Probability of noise (default: 0.05)
+        out: uint8 array of the image's shape to write the result into
     """
     # Convert to numpy array if needed
     if isinstance(image, Image.Image):
-        # Ensure image is in RGB mode
-        if image.mode != 'RGB':
+        # Ensure image is in RGB mode, keeping grayscale single-channel
+        if image.mode not in ('RGB', 'L'):
             image = image.convert('RGB')
-        image = np.array(image)
+        image = np.asarray(image)
     
-    noisy_image = np.copy(image)
-    
-    # Generate single mask for all channels if RGB
-    if len(image.shape) == 3:
-        # Salt noise
-        salt_mask = np.random.random(image.shape[:2]) < (prob/2)
-        salt_mask = np.dstack([salt_mask] * 3)
-        noisy_image[salt_mask] = 255
-        
-        # Pepper noise
-        pepper_mask = np.random.random(image.shape[:2]) < (prob/2)
-        pepper_mask = np.dstack([pepper_mask] * 3)
-        noisy_image[pepper_mask] = 0
+    # Start from a copy of the image, in the caller's buffer if it can hold it
+    if image.dtype == np.uint8 and out is not None:
+        noisy_image = out
+        np.copyto(noisy_image, image)
     else:
-        # Salt noise for grayscale
-        salt_mask = np.random.random(image.shape) < (prob/2)
-        noisy_image[salt_mask] = 255
-        
-        # Pepper noise for grayscale
-        pepper_mask = np.random.random(image.shape) < (prob/2)
-        noisy_image[pepper_mask] = 0
+        copies.record("SaltAndPepperNoise.copy")
+        noisy_image = np.copy(image)
+    
+    # Generate single mask for all channels if RGB; a 2D mask selects whole pixels
+    # Salt noise
+    salt_mask = np.random.random(image.shape[:2]) < (prob/2)
+    noisy_image[salt_mask] = 255
+    
+    # Pepper noise
+    pepper_mask = np.random.random(image.shape[:2]) < (prob/2)
+    noisy_image[pepper_mask] = 0
     
-    return noisy_image.astype(np.uint8)
+    if noisy_image.dtype == np.uint8:
+        return noisy_image
+    return store(noisy_image, out)
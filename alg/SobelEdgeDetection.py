@@ -1,39 +1,62 @@
 import numpy as np
 from PIL import Image
+from profiling import copies
 
-def SobelEdgeDetection(image, threshold=30):
+def SobelEdgeDetection(image, threshold=30, return_gradients=False):
     """
     Apply Sobel edge detection to an image
     Args:
         image: Input image
         threshold: Edge detection threshold (default: 30)
+        return_gradients: Also return the float32 gradient magnitude and
+                          orientation (radians) arrays (default: False)
+    Returns:
+        numpy.ndarray: Binary uint8 edge map, or (edges, magnitude, orientation)
+                   when return_gradients is True
     """
     # Convert to numpy array if needed
     if isinstance(image, Image.Image):
-        image = np.array(image)
-    
+        image = np.asarray(image)
+
     # Convert to grayscale if needed
     if len(image.shape) == 3:
         image = np.dot(image[...,:3], [0.2989, 0.5870, 0.1140])
-    
-    # Sobel operators
-    Gx = np.array([[-1, 0, 1],
-                   [-2, 0, 2],
-                   [-1, 0, 1]])
-    
-    Gy = np.array([[-1, -2, -1],
-                   [0, 0, 0],
-                   [1, 2, 1]])
-    
-    rows, cols = image.shape
-    edges = np.zeros_like(image)
-    
-    # Apply Sobel operators
-    for i in range(1, rows - 1):
-        for j in range(1, cols - 1):
-            gx = np.sum(image[i-1:i+2, j-1:j+2] * Gx)
-            gy = np.sum(image[i-1:i+2, j-1:j+2] * Gy)
-            magnitude = np.sqrt(gx**2 + gy**2)
-            edges[i, j] = 255 if magnitude > threshold else 0
-    
-    return Image.fromarray(edges.astype(np.uint8))
+
+    gx, gy = sobel_gradients(image)
+
+    # Threshold the interior; the one pixel border stays 0 as before
+    edges = np.zeros(image.shape, dtype=np.uint8)
+    edges[1:-1, 1:-1] = np.where(np.sqrt(gx**2 + gy**2) > threshold, 255, 0)
+
+    if not return_gradients:
+        return edges
+
+    magnitude = np.zeros(image.shape, dtype=np.float32)
+    orientation = np.zeros(image.shape, dtype=np.float32)
+    magnitude[1:-1, 1:-1] = np.hypot(gx, gy)
+    orientation[1:-1, 1:-1] = np.arctan2(gy, gx)
+
+    return edges, magnitude, orientation
+
+def sobel_gradients(image):
+    """
+    Compute the Sobel x/y gradients of the image interior with separable
+    [1, 2, 1] x [-1, 0, 1] passes over shifted slices
+    Args:
+        image: 2D grayscale array
+    Returns:
+        tuple: (gx, gy) float64 arrays of shape (rows - 2, cols - 2)
+    """
+    if image.dtype != np.float64:
+        copies.record("SobelEdgeDetection.astype")
+    image = np.asarray(image, dtype=np.float64)
+
+    # Gx: smooth vertically, then difference horizontally
+    smooth = image[:-2] + 2 * image[1:-1] + image[2:]
+    gx = smooth[:, 2:] - smooth[:, :-2]
+
+    # Gy: difference vertically, then smooth horizontally
+    diff = image[2:] - image[:-2]
+    gy = diff[:, :-2] + 2 * diff[:, 1:-1] + diff[:, 2:]
+
+    return gx, gy
@@ -1,26 +1,25 @@
 import numpy as np
 from PIL import Image
+from alg._noise import add_noise
 
-def UniformNoise(image, low=-0.2, high=0.2):
+def UniformNoise(image, low=-0.2, high=0.2, seed=None, origin=(0, 0), out=None):
     """
     Add uniform noise to an image
     Args:
         image: Input image
         low: Lower bound of uniform distribution (default: -0.2)
         high: Upper bound of uniform distribution (default: 0.2)
+        seed: Seed of the noise, for a repeatable result (default: drawn from np.random)
+        origin: (row, column) of the image when it is a tile of a larger one, whose
+                noise it then shares (default: (0, 0))
+        out: uint8 array of the image's shape to write the result into
     """
     # Convert to numpy array if needed
     if isinstance(image, Image.Image):
-        # Ensure image is in RGB mode
-        if image.mode != 'RGB':
+        # Ensure image is in RGB mode, keeping grayscale single-channel
+        if image.mode not in ('RGB', 'L'):
             image = image.convert('RGB')
-        image = np.array(image)
+        image = np.asarray(image)
     
-    # Generate uniform noise
-    noise = np.random.uniform(low * 255, high * 255, image.shape)
-    
-    # Add noise and clip values
-    noisy_image = image.astype(np.float32) + noise
-    noisy_image = np.clip(noisy_image, 0, 255).astype(np.uint8)
-    
-    return noisy_image
+    # Draw float32 noise block by block from seeded streams, adding the image in place
+    return add_noise(image, "uniform", seed, out, origin, low=low, high=high)
@@ -1,17 +1,19 @@
 import numpy as np
 from PIL import Image
+from alg._buffers import filter_channels
 from scipy.ndimage import convolve
 
-def WeightFilter(image, kernel=None):
+def WeightFilter(image, kernel=None, out=None):
     """
     Apply weighted filter to an image
     Args:
         image: Input image
         kernel: Custom weight kernel (default: Gaussian-like kernel)
+        out: uint8 array of the image's shape to write the result into
     """
     # Convert to numpy array if needed
     if isinstance(image, Image.Image):
-        image = np.array(image)
+        image = np.asarray(image)
     
     # Default kernel (Gaussian-like)
     if kernel is None:
@@ -19,15 +21,5 @@ def WeightFilter(image, kernel=None):
                           [2, 4, 2],
                           [1, 2, 1]]) / 16.0
     
-    # Handle RGB images
-    if len(image.shape) == 3:
-        filtered = np.zeros_like(image)
-        for channel in range(image.shape[2]):
-            filtered[:,:,channel] = convolve(image[:,:,channel], kernel)
-    else:
-        filtered = convolve(image, kernel)
-    
-    # Clip values and convert to uint8
-    filtered = np.clip(filtered, 0, 255).astype(np.uint8)
-    
-    return filtered
+    # Handle RGB images; values are clipped before the uint8 conversion
+    return filter_channels(convolve, image, out, clip=True, weights=kernel)
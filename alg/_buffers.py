@@ -0,0 +1,82 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from profiling import copies
+
+# Threads filtering the channels of one image side by side; scipy.ndimage
+# releases the GIL while it filters
+_channel_pool = None
+_channel_pool_lock = threading.Lock()
+
+
+def _channel_executor():
+    global _channel_pool
+    with _channel_pool_lock:
+        if _channel_pool is None:
+            _channel_pool = ThreadPoolExecutor(max_workers=min(4, os.cpu_count() or 1),
+                                               thread_name_prefix="filter-channel")
+        return _channel_pool
+
+
+def store(result, out=None):
+    """
+    Cast a result to uint8, into a caller's buffer when one is given
+    Args:
+        result: Algorithm result, clipped already if it needs to be
+        out: uint8 array of the result's shape (default: a new array)
+    Returns:
+        numpy.ndarray: uint8 result, out when given
+    """
+    copies.record("store")
+    if out is None:
+        return result.astype(np.uint8)
+    np.copyto(out, result, casting='unsafe')
+    return out
+
+def filter_channels(filter_func, image, out=None, clip=False, size=None, **kwargs):
+    """
+    Apply a scipy.ndimage filter to each channel of an image
+    uint8 images are filtered straight into the result buffer; other dtypes
+    are filtered in their own dtype, then cast like the algorithms always did.
+    Filters with a size filter every channel in one call with a (size, size, 1)
+    window; weighted filters run the channels concurrently when there are
+    several cores, as a (k, k, 1) kernel is slower than separate passes.
+    Args:
+        filter_func: scipy.ndimage filter accepting output=
+        image: 2D or 3D image array
+        out: uint8 array of the image's shape to write into (default: a new array)
+        clip: Clip non-uint8 results to [0, 255] before the cast (default: False)
+        size: Side of the square filter window, for size-based filters
+        **kwargs: Other filter arguments
+    Returns:
+        numpy.ndarray: uint8 result, out when given
+    """
+    if image.dtype == np.uint8:
+        filtered = out if out is not None else np.empty_like(image)
+    else:
+        filtered = np.empty_like(image)
+
+    if size is not None:
+        # A window of one along the channel axis never mixes channels
+        window = (size, size, 1) if image.ndim == 3 else size
+        filter_func(image, output=filtered, size=window, **kwargs)
+    elif image.ndim == 3 and image.shape[2] > 1 and (os.cpu_count() or 1) > 1:
+        jobs = [_channel_executor().submit(filter_func, image[:, :, channel],
+                                           output=filtered[:, :, channel], **kwargs)
+                for channel in range(image.shape[2])]
+        for job in jobs:
+            job.result()
+    elif image.ndim == 3:
+        for channel in range(image.shape[2]):
+            filter_func(image[:, :, channel], output=filtered[:, :, channel], **kwargs)
+    else:
+        filter_func(image, output=filtered, **kwargs)
+
+    if filtered.dtype == np.uint8:
+        return filtered
+    if clip:
+        np.clip(filtered, 0, 255, out=filtered)
+    return store(filtered, out)
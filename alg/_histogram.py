@@ -0,0 +1,78 @@
+"""
+Histogram primitives for uint8 data
+
+One np.bincount pass gives a channel's 256-bin histogram. Percentiles,
+stretches and equalization mappings are then computed exactly on the 256
+levels and applied to the pixels as a lookup table, instead of sorting or
+interpolating every pixel.
+"""
+import numpy as np
+
+# Every uint8 input level, in the dtype the point operations see
+LEVELS = np.arange(256, dtype=np.uint8)
+
+
+def histogram(channel):
+    """256-bin histogram of a uint8 array"""
+    return np.bincount(np.asarray(channel).ravel(), minlength=256)
+
+def channel_histograms(image):
+    """
+    256-bin histogram of each channel of a uint8 image
+    Returns:
+        numpy.ndarray: (channels, 256) counts; a 2D image has one channel
+    """
+    channels = image.reshape(image.shape[0], image.shape[1], -1)
+    return np.stack([histogram(channels[..., c]) for c in range(channels.shape[2])])
+
+def percentile_from_hist(hist, percentile):
+    """
+    Exact np.percentile (linear method) of the data summarised by a histogram
+    Args:
+        hist: 256-bin histogram of uint8 data
+        percentile: Percentile in [0, 100]
+    Returns:
+        float: Same value np.percentile would return on the data
+    """
+    cdf = np.cumsum(hist)
+    n = int(cdf[-1])
+
+    # Same virtual index and neighbours as numpy's 'linear' method
+    virtual_index = (n - 1) * np.true_divide(percentile, 100)
+    previous_index = np.floor(virtual_index)
+    gamma = virtual_index - previous_index
+    if virtual_index >= n - 1:
+        previous_index = next_index = n - 1
+    else:
+        next_index = previous_index + 1
+
+    # The k-th smallest value is the first level whose cumulative count exceeds k
+    a, b = np.searchsorted(cdf, [previous_index, next_index], side='right').astype(np.float64)
+
+    # numpy's _lerp, which interpolates from the nearer end
+    if gamma >= 0.5:
+        return b - (b - a) * (1 - gamma)
+    return a + (b - a) * gamma
+
+def stretch_table(hist, low_percentile=2, high_percentile=98):
+    """Table stretching the [low, high] percentile range of a channel to [0, 255]"""
+    low = percentile_from_hist(hist, low_percentile)
+    high = percentile_from_hist(hist, high_percentile)
+    stretched = np.clip((LEVELS - low) * 255.0 / (high - low), 0, 255)
+    return stretched.astype(np.uint8)
+
+def equalize_table(hist):
+    """Table mapping each level to its CDF, rescaled to span [0, 255]"""
+    cdf = hist.cumsum()
+    cdf = (cdf - cdf.min()) * 255 / (cdf.max() - cdf.min())
+    return cdf.astype(np.uint8)
+
+def scaled_cdf_table(hist):
+    """Table mapping each level to its CDF, rescaled to peak at the histogram's largest bin"""
+    cdf = hist.cumsum()
+    return (cdf * float(hist.max()) / cdf.max()).astype(np.uint8)
+
+def apply_table(table, channel, out=None):
+    """Map every pixel of a uint8 array through a 256-entry table"""
+    # Every uint8 index is in range, so 'clip' mode never clips and skips buffering
+    return np.take(table, channel, out=out, mode='clip')
@@ -0,0 +1,79 @@
+import numpy as np
+
+from alg._histogram import LEVELS, channel_histograms, equalize_table, stretch_table
+
+def _brightness(hist, factor=1.0):
+    return np.clip(LEVELS * factor, 0, 255).astype(np.uint8)
+
+def _negative(hist):
+    return 255 - LEVELS
+
+def _gamma_correction(hist, gamma=1.0):
+    normalized = LEVELS.astype(np.float32) / 255.0
+    corrected = np.power(normalized, gamma)
+    return np.clip(corrected * 255.0, 0, 255).astype(np.uint8)
+
+def _binary(hist, threshold=127):
+    return np.where(LEVELS > threshold, 255, 0).astype(np.uint8)
+
+# LUT builders by algorithm name; each takes the 256-bin histogram of the
+# channel it will be applied to and the algorithm's parameters
+POINT_OPERATIONS = {
+    "Brightness": _brightness,
+    "Negative": _negative,
+    "GammaCorrection": _gamma_correction,
+    "Gray2Binary": _binary,
+    "RGB2Binary": _binary,
+    "ContrastStretching": stretch_table,
+    "Histogram": equalize_table,
+}
+
+# Point operations whose table depends on the data
+HISTOGRAM_OPERATIONS = ("ContrastStretching", "Histogram")
+
+
+class LUTCompiler:
+    """
+    Composes a chain of point operations into one per-channel uint8 table
+    Args:
+        image: uint8 image (2D or HxWxC) the chain will be applied to
+        stats: ImageStats of the image, whose histograms are reused
+    """
+
+    def __init__(self, image, stats=None):
+        self.image = image
+        self.channels = 1 if image.ndim == 2 else image.shape[2]
+        self.table = np.tile(LEVELS, (self.channels, 1))
+        self.stats = stats
+        self._input_hist = None
+
+    def add(self, name, **params):
+        """Append a point operation to the chain"""
+        builder = POINT_OPERATIONS[name]
+        if name in HISTOGRAM_OPERATIONS:
+            # Histogram of the intermediate result, without materialising it
+            if self._input_hist is None:
+                self._input_hist = (self.stats.histograms() if self.stats is not None
+                                    else channel_histograms(self.image))
+            luts = [builder(np.bincount(self.table[c], weights=self._input_hist[c], minlength=256), **params)
+                    for c in range(self.channels)]
+            self.table = np.stack([lut[row] for lut, row in zip(luts, self.table)])
+        else:
+            self.table = builder(None, **params)[self.table]
+
+    def apply(self, out=None):
+        """
+        Apply the composed table with a single lookup pass per distinct table
+        Args:
+            out: Array to write the result to; may be the input image itself
+        """
+        if self.channels == 1 or (self.table == self.table[0]).all():
+            if out is None:
+                return self.table[0][self.image]
+            # Every uint8 index is in range, so 'clip' mode never clips and skips buffering
+            return np.take(self.table[0], self.image, out=out, mode='clip')
+
+        result = np.empty_like(self.image) if out is None else out
+        for c in range(self.channels):
+            result[..., c] = self.table[c][self.image[..., c]]
+        return result
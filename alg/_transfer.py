@@ -0,0 +1,183 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from alg._spectrum import is_half_spectrum
+
+# Default memory bound for cached grids and transfer functions (bytes)
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def _ideal_lowpass(D, cutoff=30):
+    return (D <= cutoff).astype(np.float32)
+
+def _ideal_highpass(D, cutoff=30):
+    return (D > cutoff).astype(np.float32)
+
+def _butterworth_lowpass(D, cutoff=30, order=2):
+    return 1 / (1 + (D / np.float32(cutoff))**(2 * order))
+
+def _butterworth_highpass(D, cutoff=30, order=2):
+    # cutoff / ~0 overflows to inf at the centre, which correctly gives H = 0
+    with np.errstate(over='ignore', divide='ignore'):
+        return 1 / (1 + (np.float32(cutoff) / (D + np.float32(1e-6)))**(2 * order))
+
+def _gaussian_lowpass(D, sigma=30):
+    return np.exp(-(D**2) / np.float32(2 * sigma**2))
+
+def _gaussian_highpass(D, sigma=30):
+    return 1 - np.exp(-(D**2) / np.float32(2 * sigma**2))
+
+# Transfer function builders by filter name, each taking the distance grid
+TRANSFER_FUNCTIONS = {
+    "IdealLowPassFilter": _ideal_lowpass,
+    "IdealHighPassFilter": _ideal_highpass,
+    "ButterworthLowPassFilter": _butterworth_lowpass,
+    "ButterworthHighPassFilter": _butterworth_highpass,
+    "GaussianLowPassFilter": _gaussian_lowpass,
+    "GaussianHighPassFilter": _gaussian_highpass,
+}
+
+
+class TransferCache:
+    """
+    LRU cache of centred distance grids and filter transfer functions
+    Args:
+        max_bytes: Memory bound for all cached arrays (default: 256 MB)
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def distance_grid(self, shape, half=False):
+        """
+        Get the float32 distance of every frequency sample from the centre
+        Args:
+            shape: (rows, cols) of the full shifted spectrum
+            half: Build the grid for the HalfSpectrum layout (default: False)
+        """
+        rows, cols = shape
+        return self._get(("D", rows, cols, half), lambda: self._build_grid(rows, cols, half))
+
+    def transfer_function(self, name, shape, half=False, **params):
+        """
+        Get the float32 transfer function H of a frequency-domain filter
+        Args:
+            name: Filter name, one of TRANSFER_FUNCTIONS
+            shape: (rows, cols) of the full shifted spectrum
+            half: Build H for the HalfSpectrum layout (default: False)
+            **params: Filter parameters (cutoff, order, sigma)
+        """
+        builder = TRANSFER_FUNCTIONS[name]
+        key = ("H", tuple(shape), half, name, tuple(sorted(params.items())))
+        return self._get(key, lambda: builder(self.distance_grid(shape, half), **params).astype(np.float32))
+
+    def spectrum_transfer_function(self, name, spectrum, **params):
+        """
+        Get H laid out to match the given spectrum, full or HalfSpectrum
+        Args:
+            name: Filter name, one of TRANSFER_FUNCTIONS
+            spectrum: Frequency domain data the filter will be applied to
+            **params: Filter parameters (cutoff, order, sigma)
+        """
+        if is_half_spectrum(spectrum):
+            return self.transfer_function(name, spectrum.full_shape, half=True, **params)
+        return self.transfer_function(name, spectrum.shape, **params)
+
+    def combined_transfer_function(self, filters, spectrum):
+        """
+        Get the product of several filters' H, laid out to match the spectrum
+        Args:
+            filters: Sequence of (name, params) pairs, applied in order
+            spectrum: Frequency domain data the filters will be applied to
+        """
+        half = is_half_spectrum(spectrum)
+        shape = spectrum.full_shape if half else spectrum.shape
+        key = ("H*", tuple(shape), half,
+               tuple((name, tuple(sorted(params.items()))) for name, params in filters))
+
+        def build():
+            combined = np.ones(self.distance_grid(shape, half).shape, dtype=np.float32)
+            for name, params in filters:
+                combined *= self.transfer_function(name, shape, half, **params)
+            return combined
+
+        return self._get(key, build)
+
+    def set_max_bytes(self, max_bytes):
+        """Change the memory bound, evicting entries that no longer fit"""
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def clear(self):
+        """Drop all cached arrays and reset the statistics"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """Return hit/miss counters and current memory use"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def _get(self, key, build):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            self.misses += 1
+
+        # Build outside the lock; a transfer function may need the grid
+        value = build()
+        value.setflags(write=False)
+
+        with self._lock:
+            if key not in self._entries and value.nbytes <= self.max_bytes:
+                self._entries[key] = value
+                self._bytes += value.nbytes
+                self._evict()
+        return value
+
+    def _evict(self):
+        while self._bytes > self.max_bytes and self._entries:
+            _, value = self._entries.popitem(last=False)
+            self._bytes -= value.nbytes
+            self.evictions += 1
+
+    @staticmethod
+    def _build_grid(rows, cols, half=False):
+        crow, ccol = rows // 2, cols // 2
+        u = np.arange(rows, dtype=np.float32) - crow
+        if half:
+            # Only the non-negative horizontal frequencies are stored
+            v = np.arange(cols // 2 + 1, dtype=np.float32)
+        else:
+            v = np.arange(cols, dtype=np.float32) - ccol
+        return np.sqrt(u[:, np.newaxis]**2 + v[np.newaxis, :]**2)
+
+
+# Shared cache used by the frequency-domain filters in alg/
+cache = TransferCache()
+
+distance_grid = cache.distance_grid
+transfer_function = cache.transfer_function
+spectrum_transfer_function = cache.spectrum_transfer_function
+combined_transfer_function = cache.combined_transfer_function
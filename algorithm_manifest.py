@@ -0,0 +1,218 @@
+"""
+Manifest of the algorithms in alg/
+
+Everything the UI needs to list algorithms and build their parameter widgets,
+and what the executor needs to know about their inputs and outputs,
+so the window can be shown without importing any algorithm module. Modules
+are imported on first use through pipeline.load_algorithm.
+"""
+from typing import Final
+
+# Algorithm names by category tab
+ALGORITHM_CATEGORIES: Final = {
+    "Basic": ["Brightness", "Negative", "Rgb2Gray", "RGB2Binary", "Gray2Binary", "PointSharpening"],
+    "Filters": ["MeanFilter", "MedianFilter", "MaxFilter", "MinFilter", "WeightFilter", "MidPointFilter"],
+    "Edge Detection": ["SobelEdgeDetection", "RobertsEdgeDetection"],
+    "Noise": [
+        "GaussianNoise", "SaltAndPepperNoise", "UniformNoise",
+        "RayleighNoise", "GammaNoise", "ExponentialNoise"
+    ],
+    "Frequency Domain": [
+        "FourierTransform", "InverseFourierTransform",
+        "IdealLowPassFilter", "IdealHighPassFilter",
+        "ButterworthLowPassFilter", "ButterworthHighPassFilter",
+        "GaussianLowPassFilter", "GaussianHighPassFilter"
+    ],
+    "Enhancement": ["HistogramEqualization", "ContrastStretching", "GammaCorrection", "Histogram"]
+}
+
+# Parameter schemas: type, default, slider range and step
+ALGORITHM_PARAMS: Final = {
+    "Brightness": {
+        "factor": {
+            "type": "float",
+            "default": 1.0,
+            "range": [0.0, 3.0],
+            "step": 0.1
+        }
+    },
+    "PointSharpening": {
+        "factor": {
+            "type": "float",
+            "default": 1.5,
+            "range": [0.5, 3.0],
+            "step": 0.1
+        }
+    },
+    "MidPointFilter": {
+        "size": {
+            "type": "int",
+            "default": 3,
+            "range": (3, 9),
+            "step": 2
+        }
+    },
+    "SobelEdgeDetection": {
+        "threshold": {
+            "type": "int",
+            "default": 30,
+            "range": [0, 100],
+            "step": 1,
+        },
+    },
+    "RobertsEdgeDetection": {
+        "threshold": {
+            "type": "int",
+            "default": 30,
+            "range": [0, 100],
+            "step": 1,
+        },
+    },
+    "GammaNoise": {
+        "shape": {
+            "type": "float",
+            "default": 1.0,
+            "range": [0.1, 5.0],
+            "step": 0.1
+        },
+        "scale": {
+            "type": "float",
+            "default": 1.0,
+            "range": [0.1, 5.0],
+            "step": 0.1
+        }
+    },
+    "RGB2Binary": {"threshold": {"type": "int", "default": 127, "range": (0, 255), "step": 1}},
+    "Gray2Binary": {"threshold": {"type": "int", "default": 127, "range": (0, 255), "step": 1}},
+    "GaussianNoise": {
+        "mean": {
+            "type": "float",
+            "default": 0.0,
+            "range": [-0.2, 0.2],
+            "step": 0.01
+        },
+        "sigma": {
+            "type": "float",
+            "default": 0.1,
+            "range": [0.0, 0.5],
+            "step": 0.01
+        }
+    },
+    "SaltAndPepperNoise": {
+        "prob": {
+            "type": "float",
+            "default": 0.05,
+            "range": [0.0, 0.3],
+            "step": 0.01
+        }
+    },
+    "UniformNoise": {
+        "low": {
+            "type": "float",
+            "default": -0.2,
+            "range": [-0.5, 0.0],
+            "step": 0.01
+        },
+        "high": {
+            "type": "float",
+            "default": 0.2,
+            "range": [0.0, 0.5],
+            "step": 0.01
+        }
+    },
+    "RayleighNoise": {
+        "scale": {
+            "type": "float",
+            "default": 0.1,
+            "range": [0.0, 0.5],
+            "step": 0.01
+        }
+    },
+    "MeanFilter": {"size": {"type": "int", "default": 3, "range": (3, 9), "step": 2}},
+    "MedianFilter": {"size": {"type": "int", "default": 3, "range": (3, 9), "step": 2}},
+    "MaxFilter": {"size": {"type": "int", "default": 3, "range": (3, 9), "step": 2}},
+    "MinFilter": {"size": {"type": "int", "default": 3, "range": (3, 9), "step": 2}},
+    "GaussianLowPassFilter": {"sigma": {"type": "float", "default": 1.0, "range": (0.1, 5.0), "step": 0.1}},
+    "GaussianHighPassFilter": {"sigma": {"type": "float", "default": 1.0, "range": (0.1, 5.0), "step": 0.1}},
+    "IdealLowPassFilter": {"cutoff": {"type": "int", "default": 30, "range": (1, 100), "step": 1}},
+    "IdealHighPassFilter": {"cutoff": {"type": "int", "default": 30, "range": (1, 100), "step": 1}},
+    "ButterworthLowPassFilter": {
+        "cutoff": {"type": "int", "default": 30, "range": (1, 100), "step": 1},
+        "order": {"type": "int", "default": 2, "range": (1, 5), "step": 1}
+    },
+    "ButterworthHighPassFilter": {
+        "cutoff": {"type": "int", "default": 30, "range": (1, 100), "step": 1},
+        "order": {"type": "int", "default": 2, "range": (1, 5), "step": 1}
+    },
+    "GammaCorrection": {"gamma": {"type": "float", "default": 1.0, "range": (0.1, 3.0), "step": 0.1}},
+    "ContrastStretching": {
+        "low_percentile": {
+            "type": "float",
+            "default": 2.0,
+            "range": [0.0, 20.0],
+            "step": 0.5
+        },
+        "high_percentile": {
+            "type": "float",
+            "default": 98.0,
+            "range": [80.0, 100.0],
+            "step": 0.5
+        }
+    }
+}
+
+# What each algorithm accepts and produces, so the executor can keep data as
+# arrays between steps and convert only where needed:
+#   domain:   "spatial" (image to image), "frequency" (spectrum to spectrum),
+#             "to_frequency" (image to (magnitude display, spectrum); takes
+#             half_spectrum=True) or "to_spatial" (spectrum to image)
+#   spatial_fallback: a frequency filter that also runs on an image with its own FFT
+#   channels: "per_channel" (channels processed independently, count kept),
+#             "color" (channels mixed, count kept), "to_gray" (RGB mixed into
+#             one channel) or "gray" (single-channel input only)
+#   dtype:    what the result is for uint8 input: "uint8", "PIL" or "complex"
+#   in_place: the result may be written over the input buffer
+#   out:      takes out=, a uint8 buffer of the input's shape to write the result into
+#   stats:    takes stats=, the ImageStats of its input, instead of scanning it again
+#   seeded:   takes seed= and origin=; its noise only depends on the seed and the
+#             pixel's position, so tiles given their origin match the whole image
+def _caps(domain="spatial", channels="per_channel", dtype="uint8", in_place=False, spatial_fallback=False,
+          out=False, stats=False, seeded=False):
+    return {"domain": domain, "channels": channels, "dtype": dtype,
+            "in_place": in_place, "spatial_fallback": spatial_fallback, "out": out, "stats": stats,
+            "seeded": seeded}
+
+ALGORITHM_CAPABILITIES: Final = {
+    "Brightness": _caps(in_place=True, out=True),
+    "Negative": _caps(in_place=True),
+    "GammaCorrection": _caps(in_place=True),
+    "ContrastStretching": _caps(in_place=True, stats=True),
+    "Rgb2Gray": _caps(channels="to_gray"),
+    "RGB2Binary": _caps(channels="to_gray", in_place=True),
+    "Gray2Binary": _caps(channels="to_gray", in_place=True),
+    "PointSharpening": _caps(),
+    "MeanFilter": _caps(out=True),
+    "MedianFilter": _caps(out=True),
+    "MaxFilter": _caps(out=True),
+    "MinFilter": _caps(out=True),
+    "WeightFilter": _caps(out=True),
+    "MidPointFilter": _caps(out=True),
+    "SobelEdgeDetection": _caps(channels="to_gray"),
+    "RobertsEdgeDetection": _caps(channels="to_gray"),
+    "GaussianNoise": _caps(in_place=True, out=True, seeded=True),
+    "SaltAndPepperNoise": _caps(in_place=True, out=True),
+    "UniformNoise": _caps(in_place=True, out=True, seeded=True),
+    "RayleighNoise": _caps(in_place=True, out=True, seeded=True),
+    "GammaNoise": _caps(in_place=True, out=True, seeded=True),
+    "ExponentialNoise": _caps(in_place=True, out=True, seeded=True),
+    "FourierTransform": _caps(domain="to_frequency", channels="gray", dtype="complex"),
+    "InverseFourierTransform": _caps(domain="to_spatial", channels="gray"),
+    "IdealLowPassFilter": _caps(domain="frequency", channels="gray", dtype="complex"),
+    "IdealHighPassFilter": _caps(domain="frequency", channels="gray", dtype="complex"),
+    "ButterworthLowPassFilter": _caps(domain="frequency", channels="gray", dtype="complex"),
+    "ButterworthHighPassFilter": _caps(domain="frequency", channels="gray", dtype="complex"),
+    "GaussianLowPassFilter": _caps(domain="frequency", channels="gray", dtype="complex", spatial_fallback=True),
+    "GaussianHighPassFilter": _caps(domain="frequency", channels="gray", dtype="complex", spatial_fallback=True),
+    "HistogramEqualization": _caps(channels="color", stats=True),
+    "Histogram": _caps(in_place=True, stats=True),
+}
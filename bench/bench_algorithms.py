@@ -0,0 +1,217 @@
+"""
+Benchmark every algorithm in alg/ and the medical presets, with a stored baseline
+
+Algorithms are discovered like the GUI discovers them and run with their
+default parameters on seeded synthetic grayscale, RGB and RGBA images, and
+must return the dtype the manifest declares for them. Frequency
+filters and InverseFourierTransform get the half-plane spectrum the executor
+feeds them. Each medical preset runs end to end through run_sequence on the
+grayscale input.
+
+Latency is measured over --repeat runs after one warm-up run; peak allocation
+comes from a separate run under tracemalloc, which numpy reports its buffers to.
+
+Usage:
+    python bench/bench_algorithms.py --save bench/baseline.json
+    python bench/bench_algorithms.py --compare bench/baseline.json [--tolerance 0.15]
+    python bench/bench_algorithms.py --only Median --sizes 1024 2048
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import scipy
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from alg.FourierTransform import FourierTransform
+from medical_presets import MEDICAL_SEQUENCES
+from pipeline import (FREQUENCY_FILTERS, algorithm_names, build_sequence, capabilities, load_algorithm,
+                      run_sequence)
+
+# Sides of the square synthetic inputs
+DEFAULT_SIZES = (256, 512, 1024)
+
+# Relative slowdown of the median latency reported as a regression
+DEFAULT_TOLERANCE = 0.15
+
+# Regressions smaller than this many seconds are timer noise
+MIN_REGRESSION_SECONDS = 0.0005
+
+
+def synthetic_image(size, channels):
+    """Seeded gradient plus texture plus noise, so histograms and edges are realistic"""
+    rng = np.random.default_rng(size * 10 + channels)
+    y, x = np.mgrid[0:size, 0:size] / size
+    base = 128 + 60 * np.sin(6 * np.pi * x) * np.cos(4 * np.pi * y) + 50 * (x - y)
+    planes = [base + 20 * c + rng.normal(0, 12, base.shape) for c in range(channels)]
+    image = np.clip(np.stack(planes, axis=-1), 0, 255).astype(np.uint8)
+    return image[..., 0] if channels == 1 else image
+
+def discover_algorithms():
+    """Import every algorithm module, skipping the ones that fail like load_algorithms does"""
+    algorithms = {}
+    for name in algorithm_names():
+        try:
+            algorithms[name] = load_algorithm(name)
+        except Exception as e:
+            print(f"Error loading {name}: {e}", file=sys.stderr)
+    return algorithms
+
+def algorithm_input(name, image):
+    """The input the executor would hand the algorithm"""
+    if name in FREQUENCY_FILTERS or name == "InverseFourierTransform":
+        gray = image if image.ndim == 2 else np.dot(image[..., :3], [0.2989, 0.5870, 0.1140])
+        return FourierTransform(gray, half_spectrum=True)[1]
+    return image
+
+def check_dtype(name, result):
+    """Fail the run when an algorithm the manifest declares uint8 returns another dtype"""
+    if capabilities(name)["dtype"] == "uint8" and isinstance(result, np.ndarray) and result.dtype != np.uint8:
+        raise AssertionError(f"{name} returned {result.dtype}, the manifest declares uint8")
+    return result
+
+def measure(func, repeat):
+    """
+    Time func() repeatedly, then measure its peak allocation
+    Returns:
+        dict: median and p95 latency in seconds and peak allocation in bytes
+    """
+    np.random.seed(0)
+    func()  # warm-up: imports, FFT plans, transfer function caches
+
+    times = []
+    for _ in range(repeat):
+        np.random.seed(0)
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        np.random.seed(0)
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "median_s": float(np.median(times)),
+        "p95_s": float(np.percentile(times, 95)),
+        "peak_bytes": int(peak),
+    }
+
+def run_benchmarks(sizes, repeat, only=None, presets=True):
+    """
+    Benchmark the selected algorithms and presets
+    Returns:
+        dict: Results by "name/kind/size" key
+    """
+    results = {}
+    algorithms = discover_algorithms()
+    cases = [(name, func) for name, func in algorithms.items() if not only or only in name]
+    if presets:
+        cases += [(f"preset:{name}", steps) for name, steps in MEDICAL_SEQUENCES.items()
+                  if not only or only in name]
+
+    for size in sizes:
+        inputs = {"gray": synthetic_image(size, 1), "rgb": synthetic_image(size, 3),
+                  "rgba": synthetic_image(size, 4)}
+        for name, target in cases:
+            for kind, image in inputs.items():
+                if name.startswith("preset:"):
+                    if kind != "gray":
+                        continue
+                    sequence = build_sequence(target)
+                    pil_image = Image.fromarray(image)
+                    func = lambda: run_sequence(pil_image, sequence)
+                else:
+                    data = algorithm_input(name, image)
+                    func = lambda: check_dtype(name, target(data.copy()))
+
+                key = f"{name}/{kind}/{size}"
+                try:
+                    result = measure(func, repeat)
+                except AssertionError:
+                    raise
+                except Exception as e:
+                    print(f"{key:<44} skipped: {e}")
+                    continue
+
+                result["megapixels_per_s"] = size * size / 1e6 / result["median_s"]
+                results[key] = result
+                print(f"{key:<44} {result['median_s'] * 1e3:>9.2f} {result['p95_s'] * 1e3:>9.2f} "
+                      f"{result['megapixels_per_s']:>9.1f} {result['peak_bytes'] / 2**20:>9.1f}")
+    return results
+
+def compare(results, baseline, tolerance):
+    """
+    List results whose median latency grew beyond the tolerance
+    Returns:
+        list: (key, baseline seconds, current seconds) of each regression
+    """
+    regressions = []
+    for key, result in results.items():
+        reference = baseline.get(key)
+        if reference is None:
+            continue
+        before, after = reference["median_s"], result["median_s"]
+        if after > before * (1 + tolerance) and after - before > MIN_REGRESSION_SECONDS:
+            regressions.append((key, before, after))
+    return regressions
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "scipy": scipy.__version__,
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+                        help=f"sides of the square inputs (default: {' '.join(map(str, DEFAULT_SIZES))})")
+    parser.add_argument("--repeat", type=int, default=7, help="timed runs per case (default: 7)")
+    parser.add_argument("--only", help="only run algorithms and presets whose name contains this text")
+    parser.add_argument("--no-presets", action="store_true", help="skip the medical presets")
+    parser.add_argument("--save", metavar="PATH", help="write the results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="flag regressions against a JSON baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help=f"allowed relative slowdown of the median (default: {DEFAULT_TOLERANCE})")
+    args = parser.parse_args()
+
+    print(f"{'case':<44} {'median ms':>9} {'p95 ms':>9} {'MP/s':>9} {'peak MiB':>9}")
+    results = run_benchmarks(args.sizes, args.repeat, args.only, presets=not args.no_presets)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({"environment": environment(), "results": results}, f, indent=2, sort_keys=True)
+        print(f"Saved {len(results)} results to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline.get("environment") != environment():
+            print("Warning: baseline was recorded in a different environment", file=sys.stderr)
+
+        regressions = compare(results, baseline["results"], args.tolerance)
+        for key, before, after in regressions:
+            print(f"REGRESSION {key}: {before * 1e3:.2f} ms -> {after * 1e3:.2f} ms "
+                  f"(+{(after / before - 1) * 100:.0f}%)")
+        print(f"{len(regressions)} regressions beyond {args.tolerance:.0%}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
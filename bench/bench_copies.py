@@ -0,0 +1,69 @@
+"""
+Full-image copy budget of the medical presets and an eight-step sequence
+
+Each sequence runs through run_sequence on a synthetic RGB Image inside
+profiling.copies.counting(), which counts the copies the executor makes
+between steps and those made at the conversion sites inside the algorithms
+(dtype casts, duplicated or padded images, PIL round trips). The copies are
+listed by site, and the run exits 1 if a sequence makes more than its budget.
+
+Usage:
+    python bench/bench_copies.py [--size 512]
+"""
+import argparse
+import os
+import sys
+
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_algorithms import synthetic_image
+from medical_presets import MEDICAL_SEQUENCES
+from pipeline import build_sequence, run_sequence
+from profiling import copies
+
+# The point/filter sequence the copy counter was introduced for: it used to make about 30 copies
+EIGHT_STEPS = [{"name": name} for name in ("Brightness", "MeanFilter", "Negative", "MedianFilter",
+                                           "GammaCorrection", "MaxFilter", "ContrastStretching",
+                                           "WeightFilter")]
+
+# Most full-image copies each sequence may make: one out of the input Image,
+# one back into an RGB Image, and the casts its algorithms cannot avoid
+# (Rgb2Gray and the spatial Gaussian filters cast once, PointSharpening twice)
+COPY_BUDGETS = {
+    "X-ray": 5,
+    "MRI": 3,
+    "CT Scan": 5,
+    "Ultrasound": 3,
+    "Bone Density": 5,
+    "Blood Vessel": 5,
+    "eight-step": 3,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", type=int, default=512, help="side of the square RGB input (default: 512)")
+    args = parser.parse_args()
+
+    image = Image.fromarray(synthetic_image(args.size, 3))
+    sequences = dict(MEDICAL_SEQUENCES, **{"eight-step": EIGHT_STEPS})
+
+    failures = 0
+    for name, steps in sequences.items():
+        sequence = build_sequence(steps)
+        with copies.counting() as counter:
+            run_sequence(image, sequence)
+        within = counter.total <= COPY_BUDGETS[name]
+        failures += not within
+        sites = ", ".join(f"{site} {count}" for site, count in sorted(counter.sites.items()))
+        print(f"{name:<14} {counter.total:3} copies (budget {COPY_BUDGETS[name]})  "
+              f"{'ok' if within else 'OVER'}  {sites}")
+
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
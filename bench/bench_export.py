@@ -0,0 +1,73 @@
+"""
+Check that a full-resolution export matches the preview it was tuned on
+
+Each sequence runs once on a display-sized proxy of a large textured
+synthetic image, like the GUI preview, and once on the full image with its
+parameters rescaled by scale_sequence, like an export. The export is
+downsampled to the proxy size and compared with the preview; the run exits 1
+if the mean absolute difference of any sequence exceeds the tolerance.
+
+Usage:
+    python bench/bench_export.py [--size 1720] [--tolerance 1.0]
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_algorithms import synthetic_image
+from pipeline import PREVIEW_SIZE, build_sequence, preview_scale, run_sequence, scale_sequence
+
+# Frequency of the texture added to the original, in cycles per image: between
+# the low-pass cutoffs below at the proxy size and their values scaled by 4
+TEXTURE_CYCLES = 60
+
+# (label, steps) of the sequences compared: a kernel filter and frequency filters
+SEQUENCES = [
+    ("MeanFilter size=5", [{"name": "MeanFilter", "params": {"size": 5}}]),
+    ("GaussianLowPass sigma=20", [{"name": "FourierTransform"},
+                                  {"name": "GaussianLowPassFilter", "params": {"sigma": 20}},
+                                  {"name": "InverseFourierTransform"}]),
+    ("IdealLowPass cutoff=30", [{"name": "FourierTransform"},
+                                {"name": "IdealLowPassFilter", "params": {"cutoff": 30}},
+                                {"name": "InverseFourierTransform"}]),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", type=int, default=4 * PREVIEW_SIZE,
+                        help=f"side of the square grayscale original (default: {4 * PREVIEW_SIZE})")
+    parser.add_argument("--tolerance", type=float, default=1.0,
+                        help="largest mean absolute difference allowed, in levels (default: 1.0)")
+    args = parser.parse_args()
+
+    wave = np.sin(2 * np.pi * TEXTURE_CYCLES * np.arange(args.size) / args.size)
+    texture = 40 * np.outer(wave, wave)
+    original = Image.fromarray(np.clip(synthetic_image(args.size, 1) + texture, 0, 255).astype(np.uint8))
+    proxy = original.copy()
+    proxy.thumbnail((PREVIEW_SIZE, PREVIEW_SIZE), Image.Resampling.LANCZOS)
+    factor = preview_scale(original.size)
+
+    failures = 0
+    for label, steps in SEQUENCES:
+        sequence = build_sequence(steps)
+        preview = np.asarray(run_sequence(proxy, sequence), dtype=np.float64)
+        export = run_sequence(original, scale_sequence(sequence, factor))
+        downsampled = np.asarray(export.resize(proxy.size, Image.Resampling.LANCZOS), dtype=np.float64)
+        difference = np.abs(downsampled - preview).mean()
+        matches = difference <= args.tolerance
+        failures += not matches
+        print(f"{label:<26} x{factor:<5.2f} mean abs difference {difference:6.2f}  "
+              f"{'matches' if matches else 'DIFFERS'}")
+
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
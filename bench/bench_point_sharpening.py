@@ -0,0 +1,93 @@
+"""
+Benchmark PointSharpening against the original per-pixel convolution loop
+
+The loop takes minutes on large inputs, so by default it is timed on a strip
+of rows and extrapolated per pixel; pass --full to time it on the whole image.
+
+Usage:
+    python bench/bench_point_sharpening.py [--full] [--repeat N]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from alg.PointSharpening import PointSharpening
+
+# (label, (rows, cols)) of the RGB inputs
+SIZES = [
+    ("1 MP", (1000, 1000)),
+    ("4 MP", (2000, 2000)),
+    ("12 MP", (3000, 4000)),
+]
+
+
+def legacy_convolve2d(image, kernel):
+    """The original per-pixel convolution, kept here as the baseline"""
+    rows, cols = image.shape
+    k_rows, k_cols = kernel.shape
+    pad_rows = k_rows // 2
+    pad_cols = k_cols // 2
+    padded = np.pad(image, ((pad_rows, pad_rows), (pad_cols, pad_cols)), mode='edge')
+    result = np.zeros_like(image, dtype=np.float32)
+    for i in range(rows):
+        for j in range(cols):
+            result[i, j] = np.sum(padded[i:i+k_rows, j:j+k_cols] * kernel)
+    return result
+
+
+def legacy_point_sharpening(image, factor=1.5):
+    """The original per-channel PointSharpening driver"""
+    kernel = np.array([[-1, -1, -1],
+                      [-1,  9, -1],
+                      [-1, -1, -1]]) * factor
+    sharpened = np.zeros_like(image)
+    for channel in range(image.shape[2]):
+        sharpened[:, :, channel] = legacy_convolve2d(image[:, :, channel], kernel)
+    return np.clip(sharpened, 0, 255).astype(np.uint8)
+
+
+def best_of(func, repeat):
+    """Return the fastest wall time of func() over repeat runs"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--full", action="store_true",
+                        help="time the legacy loop on the whole image instead of a strip")
+    parser.add_argument("--strip-rows", type=int, default=16,
+                        help="rows used to extrapolate the legacy loop (default: 16)")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="repetitions of the vectorized path (default: 3)")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'size':>6} {'legacy (s)':>12} {'vectorized (s)':>15} {'speedup':>9}")
+    for label, (rows, cols) in SIZES:
+        image = rng.integers(0, 256, (rows, cols, 3), dtype=np.uint8)
+
+        new_time = best_of(lambda: PointSharpening(image), args.repeat)
+
+        if args.full:
+            legacy_time = best_of(lambda: legacy_point_sharpening(image), 1)
+            note = ""
+        else:
+            strip = image[:args.strip_rows]
+            legacy_time = best_of(lambda: legacy_point_sharpening(strip), 1) * rows / strip.shape[0]
+            note = " (extrapolated)"
+
+        print(f"{label:>6} {legacy_time:>12.2f} {new_time:>15.3f} {legacy_time / new_time:>8.0f}x{note}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+Cold-start budget check for the GUI and the PyInstaller build
+
+Starts the application repeatedly with IMPROCESS_EXIT_AFTER_STARTUP set, which
+makes it quit as soon as its window is drawn, and compares the median wall time
+of the whole process against a budget. It also checks, through the module list
+the application writes to IMPROCESS_STARTUP_MODULES, that starting it imports
+no algorithm module or scipy, which the manifest makes unnecessary. build.bat
+runs it against the executable it builds. Exits with status 1 when a check fails.
+
+Usage:
+    python bench/bench_startup.py [--budget 2.0] [--runs 5]
+    python bench/bench_startup.py --exe dist/improcess/improcess.exe [--budget 3.0]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Median seconds from process start to a drawn window
+DEFAULT_BUDGET = 2.0
+
+
+def eager_imports(command):
+    """Modules imported by the time the window is drawn that should wait until first use"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "modules.txt")
+        env = dict(os.environ, IMPROCESS_EXIT_AFTER_STARTUP="1", IMPROCESS_STARTUP_MODULES=path)
+        subprocess.run(command, cwd=ROOT, env=env, check=True)
+        with open(path) as f:
+            names = f.read().split()
+    return [name for name in names
+            if name.split('.')[0] == 'scipy' or (name.startswith('alg.') and not name.startswith('alg._'))]
+
+def cold_start(command, runs):
+    """Wall times of starting the application until its window is drawn"""
+    env = dict(os.environ, IMPROCESS_EXIT_AFTER_STARTUP="1")
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=ROOT, env=env, check=True)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--exe", help="check a PyInstaller build instead of `python main.py`")
+    parser.add_argument("--runs", type=int, default=5, help="number of starts (default: 5)")
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET,
+                        help=f"allowed median start time in seconds (default: {DEFAULT_BUDGET})")
+    args = parser.parse_args()
+
+    command = [os.path.abspath(args.exe)] if args.exe else [sys.executable, "main.py"]
+    modules = eager_imports(command)
+    failed = bool(modules)
+    if modules:
+        print(f"FAIL starting also imports: {', '.join(modules)}")
+    else:
+        print("ok   starting imports no algorithm module or scipy")
+
+    times = cold_start(command, args.runs)
+    median = statistics.median(times)
+    status = "ok  " if median <= args.budget else "FAIL"
+    failed = failed or median > args.budget
+    print(f"{status} cold start: median {median:.2f}s, min {min(times):.2f}s, max {max(times):.2f}s "
+          f"over {args.runs} runs (budget {args.budget:.2f}s)")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
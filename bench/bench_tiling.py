@@ -0,0 +1,203 @@
+"""
+Check and time tiled runs against the in-memory executor
+
+Each sequence runs once through run_sequence and once through run_tiled per
+tile size, reading the input from an array, from a TIFF file (decoded in row
+bands) and from a PNG file (decoded once into a cache); the tiled results
+must be identical to the in-memory one, and so must the PNG and TIFF files
+save_result writes from them a band at a time; the run exits 1 if any differs.
+Noise is seeded, so it must match as well, halos included: a neighbourhood
+step after it would show seams otherwise.
+
+Every file layout the tiled source reads raw rows from (BMP, PPM/PGM, TIFF
+in one block or in strips) or decodes into a cache (PNG, JPEG, LZW and tiled
+TIFF, palette images) is also read tile by tile and compared with Pillow's
+own decode of the file. Finally save_result writes gray, gray+alpha, RGB and
+RGBA arrays of odd sizes as PNG, TIFF and PNM with band heights that do and
+do not divide the image, and Pillow must read back the same mode, 8 bits
+per sample, one TIFF strip per band and the same pixels.
+
+Usage:
+    python bench/bench_tiling.py [--size 1024] [--tile-sizes 16 1000]
+"""
+import argparse
+import os
+import struct
+import sys
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_algorithms import synthetic_image
+from pipeline import build_sequence, run_sequence, working_mode
+from tiling import open_source, run_tiled, save_result, tiles
+
+DEFAULT_TILE_SIZES = (16, 1000)
+
+# (label, steps) of the sequences compared
+SEQUENCES = [
+    ("noise + median", [{"name": "GaussianNoise", "params": {"sigma": 0.1, "seed": 42}},
+                        {"name": "MedianFilter", "params": {"size": 5}}]),
+    ("noise + max + stretch", [{"name": "UniformNoise", "params": {"seed": 7}},
+                               {"name": "MaxFilter", "params": {"size": 3}},
+                               {"name": "ContrastStretching"}]),
+    ("rayleigh + mean", [{"name": "RayleighNoise", "params": {"seed": 3}},
+                         {"name": "MeanFilter", "params": {"size": 3}}]),
+]
+
+
+def write_tiled_tiff(path, image, tile=64):
+    """Save an RGB array as an uncompressed tiled TIFF, which Pillow cannot write"""
+    rows, cols = image.shape[:2]
+    tiles_down, tiles_across = -(-rows // tile), -(-cols // tile)
+    padded = np.zeros((tiles_down * tile, tiles_across * tile, 3), dtype=np.uint8)
+    padded[:rows, :cols] = image
+    data = b"".join(padded[r:r + tile, c:c + tile].tobytes()
+                    for r in range(0, padded.shape[0], tile) for c in range(0, padded.shape[1], tile))
+    count = tiles_down * tiles_across
+    tile_bytes = tile * tile * 3
+    tables = 8 + len(data)
+    offsets = np.arange(count, dtype="<u4") * tile_bytes + 8
+    entries = [(256, 4, 1, cols), (257, 4, 1, rows), (258, 3, 3, tables + 8 * count), (259, 3, 1, 1),
+               (262, 3, 1, 2), (277, 3, 1, 3), (284, 3, 1, 1), (322, 3, 1, tile), (323, 3, 1, tile),
+               (324, 4, count, tables), (325, 4, count, tables + 4 * count)]
+    with open(path, "wb") as file:
+        file.write(struct.pack("<2sHI", b"II", 42, tables + 8 * count + 6))
+        file.write(data)
+        file.write(offsets.tobytes() + np.full(count, tile_bytes, dtype="<u4").tobytes())
+        file.write(np.full(3, 8, dtype="<u2").tobytes())
+        file.write(struct.pack("<H", len(entries)))
+        for entry in entries:
+            file.write(struct.pack("<HHII", *entry))
+        file.write(struct.pack("<I", 0))
+
+def write_layouts(image, directory):
+    """Save an RGB array in every file layout the tiled source handles; returns {label: path}"""
+    rgb = Image.fromarray(image)
+    files = {
+        "bmp": (rgb, "input.bmp", {}),
+        "bmp gray": (rgb.convert("L"), "gray.bmp", {}),
+        "bmp palette": (rgb.convert("P"), "palette.bmp", {}),
+        "ppm": (rgb, "input.ppm", {}),
+        "pgm": (rgb.convert("L"), "input.pgm", {}),
+        "tif": (rgb, "input.tif", {}),
+        "tif rgba": (rgb.convert("RGBA"), "rgba.tif", {}),
+        "tif strips": (rgb, "strips.tif", {"tiffinfo": {278: 7}}),
+        "tif gray strips": (rgb.convert("L"), "gray_strips.tif", {"tiffinfo": {278: 5}}),
+        "tif lzw": (rgb, "lzw.tif", {"compression": "tiff_lzw"}),
+        "png": (rgb, "input.png", {}),
+        "png rgba": (rgb.convert("RGBA"), "rgba.png", {}),
+        "jpeg": (rgb, "input.jpg", {}),
+    }
+    layouts = {}
+    for label, (picture, name, options) in files.items():
+        layouts[label] = os.path.join(directory, name)
+        picture.save(layouts[label], **options)
+    layouts["tif tiles"] = os.path.join(directory, "tiles.tif")
+    write_tiled_tiff(layouts["tif tiles"], image)
+    return layouts
+
+def check_layouts(image, directory, tile_sizes):
+    """Read every layout tile by tile and compare it with Pillow's decode; returns the failures"""
+    failures = 0
+    for label, path in write_layouts(image, directory).items():
+        with Image.open(path) as picture:
+            expected = np.asarray(picture.convert(working_mode(picture.mode)))
+        source = open_source(path, directory)
+        identical = source.shape == expected.shape and all(
+            np.array_equal(source[inner], expected[inner])
+            for tile_size in tile_sizes for inner, _ in tiles(source.shape, tile_size, 0))
+        failures += not identical
+        print(f"source {label:<17} {'identical' if identical else 'DIFFERS'}")
+        del source
+    return failures
+
+
+# (shape, band heights) of the arrays save_result writes: odd sizes, bands of
+# one row, bands that do not divide the height and a single band
+SAVED_SHAPES = [((37, 53), (1, 10, 37, 1000)), ((37, 53, 3), (1, 10, 1000)),
+                ((1, 5, 3), (1, 4)), ((37, 53, 2), (10,)), ((37, 53, 4), (10,))]
+
+def check_saved(directory):
+    """Write arrays with save_result and read them back with Pillow; returns the failures"""
+    rng = np.random.default_rng(0)
+    failures = 0
+    for shape, band_heights in SAVED_SHAPES:
+        array = rng.integers(0, 256, shape, dtype=np.uint8)
+        mode = Image.fromarray(array).mode
+        extensions = ("png", "tif") + (("pgm",) if mode == "L" else ("ppm",) if mode == "RGB" else ())
+        for extension in extensions:
+            for band_rows in band_heights:
+                path = os.path.join(directory, f"saved.{extension}")
+                save_result(array, path, band_rows)
+                with Image.open(path) as reloaded:
+                    problems = []
+                    if reloaded.mode != mode:
+                        problems.append(f"mode {reloaded.mode}")
+                    if extension == "tif":
+                        tags = reloaded.tag_v2
+                        strips = -(-shape[0] // band_rows)
+                        if set(tags[258]) != {8}:
+                            problems.append(f"bits per sample {tags[258]}")
+                        if len(tags[273]) != strips or tags[278] != band_rows:
+                            problems.append(f"{len(tags[273])} strips of {tags[278]} rows")
+                    if not np.array_equal(np.asarray(reloaded), array):
+                        problems.append("pixels")
+                failures += bool(problems)
+                print(f"saved {str(shape):<12} {extension:<4} bands of {band_rows:<4} "
+                      f"{'DIFFERS: ' + ', '.join(problems) if problems else 'identical'}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", type=int, default=300, help="side of the square RGB input (default: 300)")
+    parser.add_argument("--tile-sizes", type=int, nargs="+", default=list(DEFAULT_TILE_SIZES),
+                        help=f"tile sides to compare (default: {' '.join(map(str, DEFAULT_TILE_SIZES))})")
+    args = parser.parse_args()
+
+    image = synthetic_image(args.size, 3)
+    failures = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        sources = {"array": image}
+        for extension in ("tif", "png"):
+            sources[extension] = os.path.join(tmp, f"input.{extension}")
+            Image.fromarray(image).save(sources[extension])
+        failures += check_layouts(image, tmp, args.tile_sizes)
+        failures += check_saved(tmp)
+
+        for label, steps in SEQUENCES:
+            sequence = build_sequence(steps)
+            start = time.perf_counter()
+            expected = np.asarray(run_sequence(Image.fromarray(image), sequence))
+            print(f"{label:<24} in memory           {(time.perf_counter() - start) * 1e3:9.1f} ms")
+
+            for tile_size in args.tile_sizes:
+                for kind, source in sources.items():
+                    start = time.perf_counter()
+                    result = run_tiled(source, sequence, os.path.join(tmp, "out.npy"), tile_size, workdir=tmp)
+                    elapsed = time.perf_counter() - start
+                    identical = np.array_equal(result, expected)
+                    failures += not identical
+                    print(f"{label:<24} tiles of {tile_size:<4} {kind:<5} {elapsed * 1e3:9.1f} ms  "
+                          f"{'identical' if identical else 'DIFFERS'}")
+
+                    for extension in ("png", "tif"):
+                        saved = os.path.join(tmp, f"out.{extension}")
+                        save_result(result, saved, tile_size)
+                        with Image.open(saved) as reloaded:
+                            if not np.array_equal(np.asarray(reloaded), expected):
+                                failures += 1
+                                print(f"{label:<24} tiles of {tile_size:<4} {kind:<5} saved as {extension} DIFFERS")
+                    del result
+
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
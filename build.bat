@@ -6,7 +6,9 @@ if exist ".venv\Scripts\activate.bat" (
     call .venv\Scripts\activate.bat
 )
 
-:: Run PyInstaller
+:: Run PyInstaller. Algorithms are imported by name on first use, which PyInstaller
+:: cannot follow from main.py: --collect-submodules=alg bundles them and the scipy
+:: modules they import, and --add-data keeps alg/ listable for the algorithm buttons
 pyinstaller --name=improcess ^
             --onedir ^
             --windowed ^
@@ -14,8 +16,7 @@ pyinstaller --name=improcess ^
             --hidden-import=PIL._tkinter_finder ^
             --hidden-import=customtkinter ^
             --hidden-import=tkinterdnd2 ^
-            --hidden-import=scipy.ndimage ^
-            --hidden-import=scipy.fft ^
+            --collect-submodules=alg ^
             --collect-data=customtkinter ^
             --collect-data=tkinterdnd2 ^
             --add-data=".venv\Lib\site-packages\tkinterdnd2\tkdnd;tkinterdnd2/tkdnd" ^
@@ -34,6 +35,14 @@ if errorlevel 1 (
 echo Build completed successfully!
 echo Executable is located in the dist/improcess folder
 
+:: Check the cold-start budget and lazy algorithm imports of the build
+python bench\bench_startup.py --exe dist\improcess\improcess.exe
+if errorlevel 1 (
+    echo Startup check failed!
+    pause
+    exit /b 1
+)
+
 :: Clean up build files (optional)
 echo Cleaning up build files...
 rmdir /s /q build
@@ -0,0 +1,220 @@
+"""
+Headless batch processing for improcess
+
+Runs an algorithm sequence or a medical preset over many images on a process
+pool, using the same executor as the GUI but without importing customtkinter.
+
+Examples:
+    python cli.py scans/*.png --preset X-ray -o enhanced/
+    python cli.py photos/ -s MedianFilter:size=5 -s Brightness:factor=1.2 -j 8
+    python cli.py photos/ -s FourierTransform -s IdealLowPassFilter:cutoff=40 -s InverseFourierTransform
+    python cli.py photos/ --preset MRI --scaling
+    python cli.py slide.tif -s MedianFilter:size=9 --tile-size 2048
+    python cli.py xrays/*.jpg --preset X-ray --single-channel
+"""
+import argparse
+import ast
+import glob
+import multiprocessing
+import os
+import sys
+import time
+from typing import Dict, List
+
+import numpy as np
+from PIL import Image
+
+from medical_presets import MEDICAL_SEQUENCES
+from pipeline import (PREVIEW_SIZE, SequenceError, algorithm_names, build_sequence,
+                      preview_scale, run_sequence, scale_sequence)
+from tiling import run_tiled, save_result
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.bmp', '.tiff', '.tif')
+
+# Sequence resolved once per worker process
+_worker_sequence = None
+
+
+def parse_step(text: str) -> Dict:
+    """
+    Parse a step given as "Name" or "Name:key=value,key=value"
+    Values are read as Python literals, falling back to plain strings.
+    """
+    name, _, param_text = text.partition(':')
+    params = {}
+    for item in filter(None, param_text.split(',')):
+        key, sep, value = item.partition('=')
+        if not sep:
+            raise argparse.ArgumentTypeError(f"Expected key=value in step '{text}', got '{item}'")
+        try:
+            params[key.strip()] = ast.literal_eval(value.strip())
+        except (ValueError, SyntaxError):
+            params[key.strip()] = value.strip()
+
+    name = name.strip()
+    if name not in algorithm_names():
+        raise argparse.ArgumentTypeError(f"Unknown algorithm '{name}'")
+    return {"name": name, "params": params}
+
+def collect_inputs(patterns: List[str]) -> List[str]:
+    """Expand files, directories (non-recursive) and glob patterns into image paths"""
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = [os.path.join(pattern, file) for file in sorted(os.listdir(pattern))]
+        else:
+            matches = sorted(glob.glob(pattern)) or [pattern]
+        paths.extend(path for path in matches
+                     if os.path.isfile(path) and path.lower().endswith(IMAGE_EXTENSIONS))
+
+    # Keep the first occurrence of each file
+    return list(dict.fromkeys(paths))
+
+def output_path(path: str, output_dir: str, suffix: str, fmt: str) -> str:
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(output_dir, f"{stem}{suffix}.{fmt}")
+
+def _init_worker(steps: List[Dict]):
+    global _worker_sequence
+    _worker_sequence = build_sequence(steps)
+
+def _process_image(job):
+    """Process one image in a worker; returns (path, error or None, seconds)"""
+    path, out_path, reference_size, tile_size, single_channel = job
+    start = time.perf_counter()
+    try:
+        with Image.open(path) as image:
+            sequence = _worker_sequence
+            if reference_size:
+                # Parameters are tuned on the GUI preview; scale them like a GUI export
+                sequence = scale_sequence(sequence, preview_scale(image.size, reference_size))
+            if not tile_size:
+                image.load()
+                result = run_sequence(image, sequence, single_channel=single_channel)
+
+        if tile_size:
+            # Out-of-core: tiles go through a memory-mapped array next to the output, which is
+            # the result itself for .npy output and is otherwise saved from a band at a time
+            workdir = os.path.dirname(out_path) or None
+            if out_path.lower().endswith('.npy'):
+                run_tiled(path, sequence, out_path, tile_size, workdir=workdir)
+            else:
+                array_path = out_path + '.npy'
+                try:
+                    save_result(run_tiled(path, sequence, array_path, tile_size, workdir=workdir),
+                                out_path, tile_size)
+                finally:
+                    if os.path.exists(array_path):
+                        os.remove(array_path)
+        elif out_path and out_path.lower().endswith('.npy'):
+            np.save(out_path, np.asarray(result))
+        elif out_path:
+            result.save(out_path)
+        error = None
+    except SequenceError as e:
+        error = str(e)
+    except Exception as e:
+        error = f"Error processing image: {str(e)}"
+    return path, error, time.perf_counter() - start
+
+def run_batch(jobs, steps: List[Dict], workers: int, verbose: bool = True):
+    """
+    Process all jobs on a pool of worker processes
+    Returns:
+        tuple: (number of failed images, wall time in seconds)
+    """
+    failed = 0
+    start = time.perf_counter()
+    with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(steps,)) as pool:
+        for path, error, seconds in pool.imap_unordered(_process_image, jobs):
+            if error:
+                failed += 1
+                print(f"FAILED {path}: {error}", file=sys.stderr)
+            elif verbose:
+                print(f"{path} ({seconds:.2f}s)")
+    return failed, time.perf_counter() - start
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="improcess",
+        description="Apply an improcess algorithm sequence to images without the GUI.",
+        epilog=f"Algorithms: {', '.join(algorithm_names())}")
+    parser.add_argument("inputs", nargs="+", help="image files, directories or glob patterns")
+    sequence_group = parser.add_mutually_exclusive_group(required=True)
+    sequence_group.add_argument("-s", "--step", dest="steps", action="append", type=parse_step,
+                                metavar="NAME[:key=value,...]", help="add an algorithm to the sequence (repeatable)")
+    sequence_group.add_argument("-p", "--preset", choices=list(MEDICAL_SEQUENCES),
+                                help="use a medical enhancement preset")
+    parser.add_argument("-o", "--output-dir", default="output", help="directory for results (default: output)")
+    parser.add_argument("--suffix", default="", help="text appended to output file names")
+    parser.add_argument("--format", default="png", help="output image format extension; npy saves the uint8 array "
+                             "(default: png)")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                        help="number of worker processes (default: all cores)")
+    parser.add_argument("--reference-size", type=int, default=0,
+                        help=f"image size the parameters were tuned for, e.g. {PREVIEW_SIZE} for the GUI "
+                             f"preview; kernel sizes are then scaled to each image like a GUI export "
+                             f"(default: 0, parameters apply at each image's own resolution)")
+    parser.add_argument("--scaling", action="store_true",
+                        help="rerun the batch with 1, 2, 4, ... workers up to --jobs and report throughput")
+    parser.add_argument("--tile-size", type=int, default=0,
+                        help="process each image in tiles of this size through memory-mapped files, "
+                             "for images too large for memory; png, tif and ppm/pgm results are written a band "
+                             "of rows at a time (default: 0, whole images)")
+    parser.add_argument("--single-channel", action="store_true",
+                        help="process RGB images whose channels are identical (grayscale scans saved "
+                             "as RGB) as one channel and save them as grayscale; in-memory runs only")
+    parser.add_argument("-q", "--quiet", action="store_true", help="only report errors and the summary")
+    args = parser.parse_args(argv)
+
+    steps = args.steps if args.steps else MEDICAL_SEQUENCES[args.preset]
+    paths = collect_inputs(args.inputs)
+    if not paths:
+        parser.error("no input images found")
+
+    # Outputs are named after the input stem, so scan.png and scan.tif would overwrite each other
+    outputs = {}
+    for path in paths:
+        outputs.setdefault(os.path.normcase(output_path(path, args.output_dir, args.suffix, args.format)),
+                           []).append(path)
+    clashes = [inputs for inputs in outputs.values() if len(inputs) > 1]
+    if clashes:
+        parser.error("inputs would be saved to the same output file: "
+                     + "; ".join(", ".join(inputs) for inputs in clashes))
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    jobs = [(path, output_path(path, args.output_dir, args.suffix, args.format), args.reference_size,
+             args.tile_size, args.single_channel) for path in paths]
+
+    if not args.scaling:
+        failed, seconds = run_batch(jobs, steps, max(1, args.jobs), verbose=not args.quiet)
+        print(f"Processed {len(jobs) - failed}/{len(jobs)} images in {seconds:.2f}s "
+              f"({(len(jobs) - failed) / seconds:.2f} images/s, {args.jobs} workers)")
+        return 1 if failed else 0
+
+    # Throughput at increasing worker counts
+    counts = []
+    workers = 1
+    while workers < args.jobs:
+        counts.append(workers)
+        workers *= 2
+    counts.append(max(1, args.jobs))
+
+    any_failed = False
+    baseline = None
+    print(f"{'workers':>8} {'seconds':>9} {'images/s':>9} {'speedup':>8} {'failed':>7}")
+    for workers in counts:
+        failed, seconds = run_batch(jobs, steps, workers, verbose=False)
+        any_failed = any_failed or failed > 0
+        # Only images that were processed count towards throughput
+        rate = (len(jobs) - failed) / seconds
+        if baseline is None:
+            baseline = rate
+        speedup = rate / baseline if baseline else 0.0
+        print(f"{workers:>8} {seconds:>9.2f} {rate:>9.2f} {speedup:>7.2f}x {failed:>7}")
+    return 1 if any_failed else 0
+
+
+if __name__ == '__main__':
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -3,12 +3,18 @@ import tkinter as tk
 from tkinter import filedialog
 from PIL import Image, ImageTk
 import os
-import importlib
-import inspect
+import sys
 from typing import List, Callable, Dict
 from tkinterdnd2 import DND_FILES, TkinterDnD
 import numpy as np
 import threading
+from algorithm_manifest import ALGORITHM_CATEGORIES, ALGORITHM_PARAMS
+from pipeline import (run_sequence, scale_sequence, algorithm_names, load_algorithm,
+                      SequenceError, SequenceCancelled, StepCache, PREVIEW_SIZE)
+from profiling import RunProfile
+
+# Delay after the last slider movement before the preview is recomputed
+PREVIEW_DEBOUNCE_MS = 50
 
 class ImageProcessorApp:
     def __init__(self):
@@ -53,161 +59,21 @@ class ImageProcessorApp:
 
         # Variables
         # Initialize image variables
-        self.input_image = None  # Original loaded image
+        self.input_image = None  # Display-sized proxy of the loaded image
         self.current_image = None  # Current processed image
         self.output_image = None  # Final output image
+        self.source_path = None  # Full-resolution original, decoded only on export
+        self.source_size = None  # (width, height) of the original
         self.algorithm_sequence: List[Dict] = []
-        self.algorithm_categories = {
-            "Basic": ["Brightness", "Negative", "Rgb2Gray", "RGB2Binary", "Gray2Binary", "PointSharpening"],
-            "Filters": ["MeanFilter", "MedianFilter", "MaxFilter", "MinFilter", "WeightFilter", "MidPointFilter"],
-            "Edge Detection": ["SobelEdgeDetection", "RobertsEdgeDetection"],
-            "Noise": [
-                "GaussianNoise", "SaltAndPepperNoise", "UniformNoise",
-                "RayleighNoise", "GammaNoise", "ExponentialNoise"
-            ],
-            "Frequency Domain": [
-                "FourierTransform", "InverseFourierTransform",
-                "IdealLowPassFilter", "IdealHighPassFilter",
-                "ButterworthLowPassFilter", "ButterworthHighPassFilter",
-                "GaussianLowPassFilter", "GaussianHighPassFilter"
-            ],
-            "Enhancement": ["HistogramEqualization", "ContrastStretching", "GammaCorrection", "Histogram"]
-        }
-
-        # Algorithm parameters dictionary
-        self.algorithm_params = {
-            "Brightness": {
-                "factor": {
-                    "type": "float",
-                    "default": 1.0,
-                    "range": [0.0, 3.0],
-                    "step": 0.1
-                }
-            },
-            "PointSharpening": {
-                "factor": {
-                    "type": "float",
-                    "default": 1.5,
-                    "range": [0.5, 3.0],
-                    "step": 0.1
-                }
-            },
-            "MidPointFilter": {
-                "size": {
-                    "type": "int",
-                    "default": 3,
-                    "range": (3, 9),
-                    "step": 2
-                }
-            },
-            "SobelEdgeDetection": {
-                "threshold": {
-                    "type": "int",
-                    "default": 30,
-                    "range": [0, 100],
-                    "step": 1,
-                },
-            },
-            "RobertsEdgeDetection": {
-                "threshold": {
-                    "type": "int",
-                    "default": 30,
-                    "range": [0, 100],
-                    "step": 1,
-                },
-            },
-            "GammaNoise": {
-                "shape": {
-                    "type": "float",
-                    "default": 1.0,
-                    "range": [0.1, 5.0],
-                    "step": 0.1
-                },
-                "scale": {
-                    "type": "float",
-                    "default": 1.0,
-                    "range": [0.1, 5.0],
-                    "step": 0.1
-                }
-            },
-            "RGB2Binary": {"threshold": {"type": "int", "default": 127, "range": (0, 255), "step": 1}},
-            "Gray2Binary": {"threshold": {"type": "int", "default": 127, "range": (0, 255), "step": 1}},
-            "GaussianNoise": {
-                "mean": {
-                    "type": "float",
-                    "default": 0.0,
-                    "range": [-0.2, 0.2],
-                    "step": 0.01
-                },
-                "sigma": {
-                    "type": "float",
-                    "default": 0.1,
-                    "range": [0.0, 0.5],
-                    "step": 0.01
-                }
-            },
-            "SaltAndPepperNoise": {
-                "prob": {
-                    "type": "float",
-                    "default": 0.05,
-                    "range": [0.0, 0.3],
-                    "step": 0.01
-                }
-            },
-            "UniformNoise": {
-                "low": {
-                    "type": "float",
-                    "default": -0.2,
-                    "range": [-0.5, 0.0],
-                    "step": 0.01
-                },
-                "high": {
-                    "type": "float",
-                    "default": 0.2,
-                    "range": [0.0, 0.5],
-                    "step": 0.01
-                }
-            },
-            "RayleighNoise": {
-                "scale": {
-                    "type": "float",
-                    "default": 0.1,
-                    "range": [0.0, 0.5],
-                    "step": 0.01
-                }
-            },
-            "MeanFilter": {"size": {"type": "int", "default": 3, "range": (3, 9), "step": 2}},
-            "MedianFilter": {"size": {"type": "int", "default": 3, "range": (3, 9), "step": 2}},
-            "MaxFilter": {"size": {"type": "int", "default": 3, "range": (3, 9), "step": 2}},
-            "MinFilter": {"size": {"type": "int", "default": 3, "range": (3, 9), "step": 2}},
-            "GaussianLowPassFilter": {"sigma": {"type": "float", "default": 1.0, "range": (0.1, 5.0), "step": 0.1}},
-            "GaussianHighPassFilter": {"sigma": {"type": "float", "default": 1.0, "range": (0.1, 5.0), "step": 0.1}},
-            "IdealLowPassFilter": {"cutoff": {"type": "int", "default": 30, "range": (1, 100), "step": 1}},
-            "IdealHighPassFilter": {"cutoff": {"type": "int", "default": 30, "range": (1, 100), "step": 1}},
-            "ButterworthLowPassFilter": {
-                "cutoff": {"type": "int", "default": 30, "range": (1, 100), "step": 1},
-                "order": {"type": "int", "default": 2, "range": (1, 5), "step": 1}
-            },
-            "ButterworthHighPassFilter": {
-                "cutoff": {"type": "int", "default": 30, "range": (1, 100), "step": 1},
-                "order": {"type": "int", "default": 2, "range": (1, 5), "step": 1}
-            },
-            "GammaCorrection": {"gamma": {"type": "float", "default": 1.0, "range": (0.1, 3.0), "step": 0.1}},
-            "ContrastStretching": {
-                "low_percentile": {
-                    "type": "float",
-                    "default": 2.0,
-                    "range": [0.0, 20.0],
-                    "step": 0.5
-                },
-                "high_percentile": {
-                    "type": "float",
-                    "default": 98.0,
-                    "range": [80.0, 100.0],
-                    "step": 0.5
-                }
-            }
-        }
+        self.applied_sequence: List[Dict] = []  # Sequence that produced output_image
+        self.base_sequence: List[Dict] = []  # Steps already baked into input_image
+        self.step_cache = StepCache()  # Intermediates of preview runs, reused by later runs
+        self.cancel_event = None  # Set to stop the run in flight; replaced for every new run
+        self.preview_after_id = None  # Pending debounced preview
+        self.last_profile = None  # Step timings of the run that produced output_image
+        self.output_stats = None  # ImageStats of output_image: histograms, percentiles and ranges on demand
+        self.algorithm_categories = ALGORITHM_CATEGORIES
+        self.algorithm_params = ALGORITHM_PARAMS
 
         # Current parameters for the selected algorithm
         self.current_params = {}
@@ -371,6 +237,9 @@ class ImageProcessorApp:
                         alg_item["params"][param] = val
                         self.current_params[alg_item["name"]][param] = val
 
+                        # Re-render once the slider has settled
+                        self.schedule_preview()
+
                     value.configure(command=update_value)
 
             # Add separator
@@ -414,6 +283,10 @@ class ImageProcessorApp:
         self.right_buttons = ctk.CTkFrame(self.top_control)
         self.right_buttons.pack(side=tk.RIGHT, padx=5)
 
+        self.timings_btn = ctk.CTkButton(self.right_buttons, text="Timings",
+                                         command=self.show_timings, state="disabled")
+        self.timings_btn.pack(side=tk.LEFT, padx=2)
+
         self.clear_btn = ctk.CTkButton(self.right_buttons, text="Clear Sequence",
                                        command=self.clear_sequence)
         self.clear_btn.pack(side=tk.LEFT, padx=2)
@@ -479,13 +352,25 @@ class ImageProcessorApp:
         self.progress_bar.pack_forget()
         self.status_label.pack_forget()
 
-    def start_processing(self):
-        if self.is_processing:
+    def schedule_preview(self):
+        """Rerun the sequence PREVIEW_DEBOUNCE_MS after the last parameter change"""
+        if not self.input_image or not self.algorithm_sequence:
             return
+        if self.preview_after_id is not None:
+            self.app.after_cancel(self.preview_after_id)
+        self.preview_after_id = self.app.after(PREVIEW_DEBOUNCE_MS, self.start_processing)
 
+    def start_processing(self):
+        self.preview_after_id = None
         if not self.input_image or not self.algorithm_sequence:
             return
 
+        # A newer request supersedes the run in flight, which stops at its next step
+        if self.cancel_event is not None:
+            self.cancel_event.set()
+        cancel = threading.Event()
+        self.cancel_event = cancel
+
         # Disable buttons during processing
         self.apply_btn.configure(state="disabled")
         self.clear_btn.configure(state="disabled")
@@ -496,101 +381,100 @@ class ImageProcessorApp:
         self.progress_bar.set(0)
         self.show_progress()
         self.status_label.configure(text="Processing...")
+        was_processing = self.is_processing
         self.is_processing = True
 
+        # Remember what produced this output so it can be rerun at full resolution
+        sequence = [dict(alg, params=dict(alg["params"])) for alg in self.algorithm_sequence]
+
         # Start processing thread
-        thread = threading.Thread(target=self.process_image_thread)
+        thread = threading.Thread(target=self.process_image_thread, args=(sequence, cancel))
         thread.daemon = True
         thread.start()
 
-        # Start checking progress
-        self.app.after(100, self.check_processing)
+        # Start checking progress, unless a superseded run already is
+        if not was_processing:
+            self.app.after(100, self.check_processing)
+
+    def process_image_thread(self, sequence, cancel):
+        def on_main_thread(callback, *args):
+            # Results of superseded runs are dropped
+            self.app.after(0, lambda: None if cancel.is_set() else callback(*args))
 
-    def process_image_thread(self):
+        profile = RunProfile()
+        result_stats = []
         try:
-            processed_image = self.input_image.copy()
-            total_steps = len(self.algorithm_sequence)
-
-            # Track if we're in frequency domain
-            in_frequency_domain = False
-
-            for i, alg in enumerate(self.algorithm_sequence):
-                # Update progress
-                progress = (i / total_steps)
-                self.app.after(0, self.update_progress, progress, f"Applying {alg['name']}...")
-
-                try:
-                    # Convert to numpy array if it's a PIL Image
-                    if isinstance(processed_image, Image.Image):
-                        if processed_image.mode != 'RGB':
-                            processed_image = processed_image.convert('RGB')
-                        processed_image = np.array(processed_image)
-
-                    # Apply the algorithm with parameters
-                    if alg["name"] == "FourierTransform":
-                        # Convert to grayscale if needed
-                        if len(processed_image.shape) == 3:
-                            processed_image = np.dot(processed_image[..., :3], [0.2989, 0.5870, 0.1140])
-
-                        display_spectrum, freq_data = alg["function"](processed_image, **alg.get("params", {}))
-                        processed_image = freq_data  # Store frequency domain data
-                        in_frequency_domain = True
-
-                        # Update display with magnitude spectrum
-                        self.app.after(0, self.display_image, Image.fromarray(display_spectrum), self.output_canvas)
-
-                    elif alg["name"] == "InverseFourierTransform":
-                        if not in_frequency_domain:
-                            self.app.after(0, self.show_error,
-                                         f"Error: Must apply Fourier Transform before {alg['name']}")
-                            return
-                        processed_image = alg["function"](processed_image)  # Get spatial domain image
-                        in_frequency_domain = False
-
-                    elif alg["name"] in ["IdealLowPassFilter", "IdealHighPassFilter",
-                                       "ButterworthLowPassFilter", "ButterworthHighPassFilter",
-                                       "GaussianLowPassFilter", "GaussianHighPassFilter"]:
-                        if not in_frequency_domain:
-                            self.app.after(0, self.show_error,
-                                         f"Error: Must apply Fourier Transform before {alg['name']}")
-                            return
-                        
-                        # Apply filter to frequency domain data
-                        filtered_freq = alg["function"](processed_image, **alg.get("params", {}))
-                        processed_image = filtered_freq  # Keep in frequency domain
-                        
-                        # Update display with new magnitude spectrum
-                        magnitude_spectrum = np.log(np.abs(filtered_freq) + 1)
-                        display_spectrum = ((magnitude_spectrum - magnitude_spectrum.min()) * 255
-                                          / (magnitude_spectrum.max() - magnitude_spectrum.min()))
-                        self.app.after(0, self.display_image, Image.fromarray(display_spectrum.astype(np.uint8)), self.output_canvas)
-
-                    else:
-                        if in_frequency_domain:
-                            self.app.after(0, self.show_error,
-                                         f"Error: Must apply Inverse Fourier Transform before {alg['name']}")
-                            return
-                        processed_image = alg["function"](processed_image, **alg.get("params", {}))
-
-                    # Convert back to PIL Image if not in frequency domain
-                    if not in_frequency_domain and isinstance(processed_image, np.ndarray):
-                        # Ensure the array is uint8
-                        processed_image = np.clip(processed_image, 0, 255).astype(np.uint8)
-                        processed_image = Image.fromarray(processed_image)
-
-                except Exception as e:
-                    self.app.after(0, self.show_error, f"Error applying {alg['name']}: {str(e)}")
-                    return
+            try:
+                # The executor never writes to its input, so the proxy is passed as is
+                processed_image = run_sequence(
+                    self.input_image,
+                    sequence,
+                    progress=lambda progress, status: on_main_thread(self.update_progress, progress, status),
+                    show_spectrum=lambda spectrum: on_main_thread(self.display_image,
+                                                                 Image.fromarray(spectrum), self.output_canvas),
+                    cache=self.step_cache,
+                    cancel=cancel,
+                    profile=profile,
+                    statistics=result_stats.append
+                )
+            except SequenceCancelled:
+                return
+            except SequenceError as e:
+                on_main_thread(self.show_error, str(e))
+                return
 
             # Update progress to 100%
-            self.app.after(0, self.update_progress, 1.0, "Processing complete!")
+            on_main_thread(self.update_progress, 1.0, "Processing complete!")
 
             # Update output image
-            self.output_image = processed_image
-            self.app.after(0, self.display_image, processed_image, self.output_canvas)
+            on_main_thread(self.show_output, processed_image, sequence, profile, result_stats[0])
 
         finally:
-            # Reset processing state
+            # Reset processing state once the latest run is done
+            self.app.after(0, self.finish_processing, cancel)
+
+    def show_output(self, image, sequence, profile, stats):
+        self.output_image = image
+        self.output_stats = stats
+        self.applied_sequence = sequence
+        self.last_profile = profile
+        self.display_image(image, self.output_canvas)
+        self.timings_btn.configure(state="normal")
+
+    def show_timings(self):
+        """Show the per-step breakdown of the last run, with export buttons"""
+        if self.last_profile is None:
+            return
+        profile = self.last_profile
+
+        window = ctk.CTkToplevel(self.app)
+        window.title("Step Timings")
+        window.geometry("900x400")
+
+        text = ctk.CTkTextbox(window, font=("Courier", 12), wrap="none")
+        text.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        text.insert("1.0", profile.summary())
+        text.configure(state="disabled")
+
+        def export(trace):
+            file_path = filedialog.asksaveasfilename(
+                parent=window,
+                defaultextension=".trace.json" if trace else ".json",
+                filetypes=[("Chrome trace", "*.trace.json")] if trace else [("JSON files", "*.json")]
+            )
+            if not file_path:
+                return
+            with open(file_path, 'w') as f:
+                f.write(profile.to_chrome_trace() if trace else profile.to_json())
+            self.show_message(f"Saved timings to {os.path.basename(file_path)}")
+
+        buttons = ctk.CTkFrame(window)
+        buttons.pack(pady=(0, 10))
+        ctk.CTkButton(buttons, text="Export JSON", command=lambda: export(False)).pack(side=tk.LEFT, padx=5)
+        ctk.CTkButton(buttons, text="Export Chrome Trace", command=lambda: export(True)).pack(side=tk.LEFT, padx=5)
+
+    def finish_processing(self, cancel):
+        if cancel is self.cancel_event:
             self.is_processing = False
 
     def update_progress(self, progress, status):
@@ -638,31 +522,18 @@ class ImageProcessorApp:
         self.medical_btn.configure(state="normal")  # Enable medical button
 
     def load_algorithms(self):
-        alg_path = os.path.join(os.path.dirname(__file__), 'alg')
-        loaded_algorithms = {}
-
-        # Load all algorithms first
-        for file in os.listdir(alg_path):
-            if file.endswith('.py') and not file.startswith('__'):
-                module_name = file[:-3]
-                try:
-                    module = importlib.import_module(f'alg.{module_name}')
-                    for name, obj in inspect.getmembers(module):
-                        if inspect.isfunction(obj) and name == module_name:
-                            loaded_algorithms[module_name] = obj
-                except Exception as e:
-                    print(f"Error loading {module_name}: {e}")
+        # Buttons come from the manifest; modules are imported when first added
+        available = set(algorithm_names())
 
         # Add algorithms to their respective category tabs
         for category, algs in self.algorithm_categories.items():
             tab = self.tabview.tab(category)
             for i, alg_name in enumerate(algs):
-                if alg_name in loaded_algorithms:
+                if alg_name in available:
                     row = i // 2
                     col = i % 2
                     btn = ctk.CTkButton(tab, text=alg_name,
-                                        command=lambda n=alg_name, f=loaded_algorithms[alg_name]:
-                                        self.add_to_sequence(n, f))
+                                        command=lambda n=alg_name: self.add_algorithm(n))
                     btn.grid(row=row, column=col, padx=5, pady=5, sticky="ew")
 
     def clear_sequence(self):
@@ -688,19 +559,64 @@ class ImageProcessorApp:
                        ("JPEG files", "*.jpg"),
                        ("All files", "*.*")]
         )
-        if file_path:
+        if not file_path:
+            return
+
+        # Small originals were processed at full size already
+        scale = self.proxy_scale()
+        if self.source_path is None or scale <= 1:
             self.output_image.save(file_path)
+            return
+
+        # Rerun the sequence on the full-resolution original in the background
+        sequence = scale_sequence(self.base_sequence + self.applied_sequence, scale)
+        self.save_btn.configure(state="disabled")
+        self.show_message("Exporting full-resolution image...", duration=60000)
+        thread = threading.Thread(target=self.export_image_thread, args=(file_path, sequence))
+        thread.daemon = True
+        thread.start()
+
+    def export_image_thread(self, file_path, sequence):
+        try:
+            # Uncompressed formats are memory-mapped by PIL when loaded
+            with Image.open(self.source_path) as full_image:
+                full_image.load()
+                result = run_sequence(full_image, sequence)
+            result.save(file_path)
+            message = f"Saved {result.size[0]}x{result.size[1]} image to {os.path.basename(file_path)}"
+        except Exception as e:
+            message = f"Error saving image: {str(e)}"
+        self.app.after(0, self.show_message, message)
+        self.app.after(0, lambda: self.save_btn.configure(state="normal"))
+
+    def proxy_scale(self):
+        """Ratio of the full-resolution original to the display proxy"""
+        if self.source_size is None or self.input_image is None:
+            return 1.0
+        return max(self.source_size) / max(self.input_image.size)
 
     def load_image(self, file_path):
         try:
+            # Opening only reads the header; the full image is decoded on export
             image = Image.open(file_path)
-            # Resize image to fit canvas while maintaining aspect ratio
-            display_size = (430, 430)
+
+            # A run still in flight belongs to the previous image
+            if self.cancel_event is not None:
+                self.cancel_event.set()
+
+            self.source_path = file_path
+            self.source_size = image.size
+            self.base_sequence = []
+            self.applied_sequence = []
+
+            # Interactive runs use a proxy that fits the canvas while maintaining aspect ratio
+            display_size = (PREVIEW_SIZE, PREVIEW_SIZE)
             image.thumbnail(display_size, Image.Resampling.LANCZOS)
 
             self.input_image = image
             self.display_image(image, self.input_canvas)
             self.output_image = None
+            self.output_stats = None
             self.output_canvas.delete("all")
 
             # Add placeholder text to output canvas
@@ -740,6 +656,15 @@ class ImageProcessorApp:
             anchor="center"
         )
 
+    def add_algorithm(self, name: str):
+        """Import an algorithm on first use and add it to the sequence"""
+        try:
+            func = load_algorithm(name)
+        except Exception as e:
+            self.show_message(f"Error loading {name}: {e}")
+            return
+        self.add_to_sequence(name, func)
+
     def add_to_sequence(self, name: str, func: Callable):
         # Check if this would create a duplicate in sequence
         if self.algorithm_sequence and self.algorithm_sequence[-1]["name"] == name:
@@ -790,9 +715,8 @@ class ImageProcessorApp:
     def get_algorithm_module(self, name: str):
         """Get algorithm module by name - used by medical enhancement GUI"""
         try:
-            module = importlib.import_module(f"alg.{name}")
-            return getattr(module, name)
-        except (ImportError, AttributeError):
+            return load_algorithm(name)
+        except ValueError:
             return None
 
     def run(self):
@@ -801,4 +725,11 @@ class ImageProcessorApp:
 
 if __name__ == '__main__':
     app = ImageProcessorApp()
+    if os.environ.get("IMPROCESS_EXIT_AFTER_STARTUP"):
+        # Cold-start measurement (bench/bench_startup.py): quit once the window is drawn
+        app.app.after_idle(lambda: (app.app.update(), app.app.destroy()))
     app.run()
+    if os.environ.get("IMPROCESS_STARTUP_MODULES"):
+        # Lets the startup check see what the (possibly frozen) application imported
+        with open(os.environ["IMPROCESS_STARTUP_MODULES"], 'w') as f:
+            f.write("\n".join(sorted(sys.modules)))
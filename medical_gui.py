@@ -3,54 +3,8 @@ from PIL import Image, ImageTk
 import tkinter as tk
 from typing import Dict, Any, Optional, Final
 import numpy as np
-
-# Medical image enhancement sequences
-MEDICAL_SEQUENCES: Final = {
-    "X-ray": [
-        {"name": "Rgb2Gray", "params": {}},
-        {"name": "ContrastStretching", "params": {"low_percentile": 1, "high_percentile": 99}},  # More aggressive contrast
-        {"name": "GaussianLowPassFilter", "params": {"sigma": 20}},  # Reduce noise while preserving edges
-        {"name": "HistogramEqualization", "params": {}},  # Enhance overall contrast
-        {"name": "PointSharpening", "params": {"factor": 1.2}}  # Subtle edge enhancement
-    ],
-    "MRI": [
-        {"name": "Rgb2Gray", "params": {}},
-        {"name": "ContrastStretching", "params": {"low_percentile": 2, "high_percentile": 98}},
-        {"name": "MedianFilter", "params": {"size": 3}},  # Remove speckle noise
-        {"name": "GaussianHighPassFilter", "params": {"sigma": 40}},  # Enhance tissue boundaries
-        {"name": "HistogramEqualization", "params": {}}  # Final contrast adjustment
-    ],
-    "CT Scan": [
-        {"name": "Rgb2Gray", "params": {}},
-        {"name": "ContrastStretching", "params": {"low_percentile": 1, "high_percentile": 99}},
-        {"name": "GaussianLowPassFilter", "params": {"sigma": 15}},  # Preserve fine details
-        {"name": "HistogramEqualization", "params": {}},
-        {"name": "PointSharpening", "params": {"factor": 1.3}}  # Moderate sharpening
-    ],
-    "Ultrasound": [
-        {"name": "Rgb2Gray", "params": {}},
-        {"name": "MedianFilter", "params": {"size": 5}},  # Stronger speckle noise removal
-        {"name": "ContrastStretching", "params": {"low_percentile": 2, "high_percentile": 98}},
-        {"name": "GaussianLowPassFilter", "params": {"sigma": 25}},  # Smooth while preserving boundaries
-        {"name": "HistogramEqualization", "params": {}}
-    ],
-    "Bone Density": [
-        {"name": "Rgb2Gray", "params": {}},
-        {"name": "ContrastStretching", "params": {"low_percentile": 1, "high_percentile": 99}},
-        {"name": "GaussianHighPassFilter", "params": {"sigma": 35}},  # Strong edge enhancement
-        {"name": "HistogramEqualization", "params": {}},
-        {"name": "PointSharpening", "params": {"factor": 1.5}},  # Strong sharpening
-        {"name": "MedianFilter", "params": {"size": 3}}  # Final noise cleanup
-    ],
-    "Blood Vessel": [
-        {"name": "Rgb2Gray", "params": {}},
-        {"name": "ContrastStretching", "params": {"low_percentile": 1, "high_percentile": 99}},
-        {"name": "MedianFilter", "params": {"size": 3}},  # Initial noise removal
-        {"name": "GaussianHighPassFilter", "params": {"sigma": 30}},  # Enhance vessel edges
-        {"name": "HistogramEqualization", "params": {}},
-        {"name": "PointSharpening", "params": {"factor": 1.4}}  # Enhance vessel boundaries
-    ]
-}
+from pipeline import run_sequence
+from medical_presets import MEDICAL_SEQUENCES
 
 class MedicalEnhancementGUI:
     def __init__(self, parent_app):
@@ -59,6 +13,7 @@ class MedicalEnhancementGUI:
         self.current_sequence = None
         self.preview_image = None
         self.original_image = None
+        self.preview_steps = []  # Steps that produced preview_image
         self.is_processing = False
         
     def show(self):
@@ -189,21 +144,24 @@ class MedicalEnhancementGUI:
                 input_img = self.parent_app.input_image
                 
             self.original_image = input_img.copy()
-            enhanced_image = input_img.copy()
-            
-            total_steps = len(self.current_sequence)
-            for idx, step in enumerate(self.current_sequence):
-                progress = (idx + 1) / total_steps
-                self.progress_bar.set(progress)
-                self.status_label.configure(text=f"Applying {step['name']}...")
-                
-                # Get algorithm class
+
+            # Resolve the algorithm functions, skipping any that failed to load
+            steps = []
+            for step in self.current_sequence:
                 alg_module = self.parent_app.get_algorithm_module(step['name'])
                 if alg_module:
-                    enhanced_image = alg_module(enhanced_image, **step['params'])
-                    
+                    steps.append({"name": step['name'], "function": alg_module, "params": dict(step['params'])})
+
+            def update_progress(progress, status):
+                self.progress_bar.set(progress)
+                self.status_label.configure(text=status)
                 self.window.update()
-                
+
+            # Same executor as the main window, so the full-resolution export matches
+            enhanced_image = run_sequence(input_img, steps, progress=update_progress,
+                                          cache=getattr(self.parent_app, 'step_cache', None))
+            self.preview_steps = steps
+
             # Convert back to PIL Image if needed
             if isinstance(enhanced_image, np.ndarray):
                 enhanced_image = Image.fromarray(enhanced_image.astype('uint8'))
@@ -264,6 +222,10 @@ class MedicalEnhancementGUI:
             # Update both input and output images in main window
             self.parent_app.input_image = preview_img.copy()
             self.parent_app.current_image = preview_img.copy()
+
+            # The enhancement is now part of the input; replay it on full-resolution export
+            if hasattr(self.parent_app, 'base_sequence'):
+                self.parent_app.base_sequence.extend(self.preview_steps)
             
             # Update the display in main window
             if hasattr(self.parent_app, 'display_image'):
@@ -0,0 +1,49 @@
+from typing import Final
+
+# Medical image enhancement sequences
+MEDICAL_SEQUENCES: Final = {
+    "X-ray": [
+        {"name": "Rgb2Gray", "params": {}},
+        {"name": "ContrastStretching", "params": {"low_percentile": 1, "high_percentile": 99}},  # More aggressive contrast
+        {"name": "GaussianLowPassFilter", "params": {"sigma": 20}},  # Reduce noise while preserving edges
+        {"name": "HistogramEqualization", "params": {}},  # Enhance overall contrast
+        {"name": "PointSharpening", "params": {"factor": 1.2}}  # Subtle edge enhancement
+    ],
+    "MRI": [
+        {"name": "Rgb2Gray", "params": {}},
+        {"name": "ContrastStretching", "params": {"low_percentile": 2, "high_percentile": 98}},
+        {"name": "MedianFilter", "params": {"size": 3}},  # Remove speckle noise
+        {"name": "GaussianHighPassFilter", "params": {"sigma": 40}},  # Enhance tissue boundaries
+        {"name": "HistogramEqualization", "params": {}}  # Final contrast adjustment
+    ],
+    "CT Scan": [
+        {"name": "Rgb2Gray", "params": {}},
+        {"name": "ContrastStretching", "params": {"low_percentile": 1, "high_percentile": 99}},
+        {"name": "GaussianLowPassFilter", "params": {"sigma": 15}},  # Preserve fine details
+        {"name": "HistogramEqualization", "params": {}},
+        {"name": "PointSharpening", "params": {"factor": 1.3}}  # Moderate sharpening
+    ],
+    "Ultrasound": [
+        {"name": "Rgb2Gray", "params": {}},
+        {"name": "MedianFilter", "params": {"size": 5}},  # Stronger speckle noise removal
+        {"name": "ContrastStretching", "params": {"low_percentile": 2, "high_percentile": 98}},
+        {"name": "GaussianLowPassFilter", "params": {"sigma": 25}},  # Smooth while preserving boundaries
+        {"name": "HistogramEqualization", "params": {}}
+    ],
+    "Bone Density": [
+        {"name": "Rgb2Gray", "params": {}},
+        {"name": "ContrastStretching", "params": {"low_percentile": 1, "high_percentile": 99}},
+        {"name": "GaussianHighPassFilter", "params": {"sigma": 35}},  # Strong edge enhancement
+        {"name": "HistogramEqualization", "params": {}},
+        {"name": "PointSharpening", "params": {"factor": 1.5}},  # Strong sharpening
+        {"name": "MedianFilter", "params": {"size": 3}}  # Final noise cleanup
+    ],
+    "Blood Vessel": [
+        {"name": "Rgb2Gray", "params": {}},
+        {"name": "ContrastStretching", "params": {"low_percentile": 1, "high_percentile": 99}},
+        {"name": "MedianFilter", "params": {"size": 3}},  # Initial noise removal
+        {"name": "GaussianHighPassFilter", "params": {"sigma": 30}},  # Enhance vessel edges
+        {"name": "HistogramEqualization", "params": {}},
+        {"name": "PointSharpening", "params": {"factor": 1.4}}  # Enhance vessel boundaries
+    ]
+}
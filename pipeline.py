@@ -0,0 +1,700 @@
+import hashlib
+import importlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+from PIL import Image
+
+from alg._lut import POINT_OPERATIONS, LUTCompiler
+from alg._stats import ImageStats
+from alg._transfer import combined_transfer_function
+from algorithm_manifest import ALGORITHM_CAPABILITIES
+from profiling import NULL_TIMER, RunProfile, copies
+
+# Directory holding one module per algorithm, each defining a function of the same name
+ALG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'alg')
+
+# Longest side of the interactive preview proxy; parameters are tuned at this size
+PREVIEW_SIZE = 430
+
+# Declaration assumed for algorithms missing from the manifest: an image-to-image
+# step that may mix channels and whose result is always normalised
+DEFAULT_CAPABILITIES = {"domain": "spatial", "channels": "color", "dtype": "any",
+                        "in_place": False, "spatial_fallback": False, "out": False, "stats": False,
+                        "seeded": False}
+
+# Filters that operate on FourierTransform output
+FREQUENCY_FILTERS = tuple(name for name, caps in ALGORITHM_CAPABILITIES.items()
+                          if caps["domain"] == "frequency")
+
+# Frequency filters that also accept a spatial image and run their own FFT
+SPATIAL_FREQUENCY_FILTERS = tuple(name for name in FREQUENCY_FILTERS
+                                  if ALGORITHM_CAPABILITIES[name]["spatial_fallback"])
+
+# Image modes holding a single channel; they are worked on as 'L' arrays of
+# shape (H, W) instead of being expanded to RGB
+SINGLE_CHANNEL_MODES = ("1", "L", "LA", "La", "I", "I;16", "I;16L", "I;16B", "I;16N", "F")
+
+# Kernel sizes measured in pixels, which must grow with the image to keep the
+# same effect. Frequency cutoffs and sigmas are distances from the centre of
+# the spectrum in cycles per image, which do not change with resolution, so
+# they are not listed.
+SIZE_DEPENDENT_PARAMS = {
+    "MeanFilter": ("size",),
+    "MedianFilter": ("size",),
+    "MaxFilter": ("size",),
+    "MinFilter": ("size",),
+    "MidPointFilter": ("size",),
+}
+
+
+# Default memory bound of a StepCache
+DEFAULT_CACHE_BYTES = 128 * 1024 * 1024
+
+# Default memory bound for the idle buffers of a BufferPool
+DEFAULT_POOL_BYTES = 256 * 1024 * 1024
+
+
+# Algorithm functions already imported by load_algorithm
+_resolved: Dict[str, Callable] = {}
+
+
+class SequenceError(Exception):
+    """Raised when a sequence cannot be applied; the message is user-facing"""
+
+
+class SequenceCancelled(Exception):
+    """Raised between steps when a run's cancellation event has been set"""
+
+
+class StepCache:
+    """
+    LRU cache of intermediate results, keyed by the chain of steps that produced them
+    Results are stored as read-only arrays, with the statistics computed on
+    them so far, so a rerun can resume from the last unchanged step without
+    rescanning it.
+    Args:
+        max_bytes: Memory bound for all cached intermediates (default: 128 MB)
+    """
+
+    def __init__(self, max_bytes=DEFAULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Return the (image, in_frequency_domain) pair stored under key, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def statistics(self, key) -> Optional[ImageStats]:
+        """Return the ImageStats kept with the result stored under key, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return None if entry is None else entry[2]
+
+    def put(self, key, image, in_frequency_domain, stats=None):
+        """Store the result of the step chain identified by key, with its ImageStats"""
+        if isinstance(image, np.ndarray):
+            image.setflags(write=False)
+        size = self._size(image)
+
+        with self._lock:
+            if key in self._entries or size > self.max_bytes:
+                return
+            self._entries[key] = ((image, in_frequency_domain), size, stats)
+            self._bytes += size
+            self._evict()
+
+    def set_max_bytes(self, max_bytes):
+        """Change the memory bound, evicting entries that no longer fit"""
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def clear(self):
+        """Drop all cached intermediates and reset the statistics"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """Return hit/miss counters and current memory use"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def _evict(self):
+        while self._bytes > self.max_bytes and self._entries:
+            _, (_, size, _) = self._entries.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+
+    @staticmethod
+    def _size(image):
+        if isinstance(image, Image.Image):
+            return image.width * image.height * len(image.getbands())
+        return image.nbytes
+
+
+class BufferPool:
+    """
+    Idle result buffers kept for reuse, keyed by shape and dtype
+    The executor acquires the out= buffer of a step here and hands back the
+    buffers it no longer refers to, so repeated runs on images of one size
+    stop allocating. Least recently released buffers are dropped first.
+    Args:
+        max_bytes: Memory bound for all idle buffers (default: 256 MB)
+    """
+
+    def __init__(self, max_bytes=DEFAULT_POOL_BYTES):
+        self.max_bytes = max_bytes
+        self._free = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def acquire(self, shape, dtype=np.uint8) -> np.ndarray:
+        """Take an idle buffer of this shape and dtype, or allocate one; its contents are undefined"""
+        key = (tuple(shape), np.dtype(dtype).str)
+        with self._lock:
+            free = self._free.get(key)
+            if free:
+                buffer = free.pop()
+                if not free:
+                    del self._free[key]
+                self._bytes -= buffer.nbytes
+                self.hits += 1
+                return buffer
+            self.misses += 1
+        return np.empty(shape, dtype=dtype)
+
+    def release(self, buffer):
+        """Hand a buffer back for reuse; views and read-only (cached) arrays are ignored"""
+        if (not isinstance(buffer, np.ndarray) or buffer.base is not None
+                or not buffer.flags.writeable or buffer.nbytes > self.max_bytes):
+            return
+        key = (buffer.shape, buffer.dtype.str)
+        with self._lock:
+            free = self._free.setdefault(key, [])
+            if any(idle is buffer for idle in free):
+                return
+            free.append(buffer)
+            self._free.move_to_end(key)
+            self._bytes += buffer.nbytes
+            self._evict()
+
+    def set_max_bytes(self, max_bytes):
+        """Change the memory bound, dropping idle buffers that no longer fit"""
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def clear(self):
+        """Drop all idle buffers and reset the statistics"""
+        with self._lock:
+            self._free.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """Return reuse counters and the memory held by idle buffers"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "idle": sum(len(free) for free in self._free.values()),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def _evict(self):
+        while self._bytes > self.max_bytes and self._free:
+            key, free = next(iter(self._free.items()))
+            buffer = free.pop(0)
+            if not free:
+                del self._free[key]
+            self._bytes -= buffer.nbytes
+            self.evictions += 1
+
+
+# Buffer pool of the executor, shared by all runs in the process
+buffer_pool = BufferPool()
+
+
+def image_key(image) -> str:
+    """Identity of an input image, from its pixels"""
+    digest = hashlib.blake2b(digest_size=16)
+    if isinstance(image, Image.Image):
+        digest.update(repr((image.mode, image.size)).encode())
+        digest.update(image.tobytes())
+    else:
+        image = np.ascontiguousarray(image)
+        digest.update(repr((image.dtype.str, image.shape)).encode())
+        digest.update(image.tobytes())
+    return digest.hexdigest()
+
+def step_key(upstream_key: str, step: List[Dict]) -> str:
+    """
+    Key of a step's output: its upstream key plus the names and parameters of its algorithms
+    """
+    digest = hashlib.blake2b(upstream_key.encode(), digest_size=16)
+    for alg in step:
+        digest.update(alg["name"].encode())
+        for param, value in sorted(alg.get("params", {}).items()):
+            digest.update(param.encode())
+            if isinstance(value, np.ndarray):
+                # repr() abbreviates large arrays
+                digest.update(repr((value.dtype.str, value.shape)).encode())
+                digest.update(np.ascontiguousarray(value).tobytes())
+            else:
+                digest.update(repr(value).encode())
+    return digest.hexdigest()
+
+
+def algorithm_names() -> List[str]:
+    """List the algorithms available in alg/, without importing them"""
+    return sorted(file[:-3] for file in os.listdir(ALG_DIR)
+                  if file.endswith('.py') and not file.startswith('_'))
+
+def load_algorithm(name: str) -> Callable:
+    """
+    Import an algorithm function by name, on first use only
+    Raises:
+        ValueError: If alg/ has no such algorithm or its module fails to import
+    """
+    function = _resolved.get(name)
+    if function is None:
+        try:
+            module = importlib.import_module(f"alg.{name}")
+            function = getattr(module, name)
+        except (ImportError, AttributeError) as e:
+            raise ValueError(f"Unknown algorithm: {name}") from e
+        except Exception as e:
+            raise ValueError(f"{type(e).__name__} in alg.{name}: {str(e)}") from e
+        _resolved[name] = function
+    return function
+
+def capabilities(name: str) -> Dict:
+    """What an algorithm accepts and produces, as declared in the manifest"""
+    return ALGORITHM_CAPABILITIES.get(name, DEFAULT_CAPABILITIES)
+
+def build_sequence(steps: List[Dict]) -> List[Dict]:
+    """
+    Resolve {"name", "params"} steps (e.g. a medical preset) into algorithm entries
+    """
+    return [{"name": step["name"], "function": load_algorithm(step["name"]),
+             "params": dict(step.get("params", {}))} for step in steps]
+
+def preview_scale(size, preview_size: int = PREVIEW_SIZE) -> float:
+    """
+    Ratio of an image to its preview proxy, used to rescale parameters
+    Args:
+        size: (width, height) of the image
+        preview_size: Longest side of the proxy
+    """
+    return max(1.0, max(size) / preview_size)
+
+def scale_params(name: str, params: Dict, factor: float) -> Dict:
+    """
+    Rescale the size-dependent parameters of one algorithm
+    Args:
+        name: Algorithm name
+        params: Parameters tuned for the current image size
+        factor: Ratio of the target image size to the current one
+    Returns:
+        dict: Parameters for the target image size
+    """
+    scaled = dict(params)
+    for param in SIZE_DEPENDENT_PARAMS.get(name, ()):
+        if param in scaled:
+            # Kernel sizes stay odd so the window keeps a centre pixel
+            size = max(1, int(round(scaled[param] * factor)))
+            scaled[param] = size if size % 2 else size + 1
+    return scaled
+
+def scale_sequence(sequence: List[Dict], factor: float) -> List[Dict]:
+    """
+    Copy a sequence with its size-dependent parameters rescaled, so a
+    sequence tuned on a preview proxy gives the same result at full size
+    Args:
+        sequence: Algorithm entries with "name", "function" and "params"
+        factor: Ratio of the target image size to the proxy size
+    Returns:
+        list: New algorithm entries
+    """
+    return [dict(alg, params=scale_params(alg["name"], alg.get("params", {}), factor))
+            for alg in sequence]
+
+def plan_sequence(sequence: List[Dict]) -> List[List[Dict]]:
+    """
+    Group a sequence into execution steps
+    Consecutive frequency filters are grouped so their transfer functions can
+    be multiplied together and the spectrum touched only once. Consecutive
+    point operations are grouped so they compile into a single lookup table.
+    Args:
+        sequence: Algorithm entries with "name", "function" and "params"
+    Returns:
+        list: Steps, each a list of one or more algorithm entries
+    """
+    def group(name):
+        if capabilities(name)["domain"] == "frequency":
+            return "frequency"
+        if name in POINT_OPERATIONS:
+            return "point"
+        return None
+
+    steps = []
+    for alg in sequence:
+        kind = group(alg["name"])
+        if kind and steps and group(steps[-1][-1]["name"]) == kind:
+            steps[-1].append(alg)
+        else:
+            steps.append([alg])
+    return steps
+
+def apply_point_operations(algs: List[Dict], image: np.ndarray, in_place: bool = False,
+                           stats: Optional[ImageStats] = None) -> np.ndarray:
+    """
+    Apply a run of point operations as one composed uint8 lookup table
+    An operation that turns RGB data into one channel mixes the channels, so
+    it ends the table, runs normally and a new table starts after it.
+    Args:
+        algs: Point operation entries, in sequence order
+        image: uint8 image
+        in_place: The image buffer is private and may be overwritten by
+                  operations declared in_place (default: False)
+        stats: ImageStats of the image, whose histograms the table reuses
+    Returns:
+        numpy.ndarray: uint8 result
+    """
+    if image.dtype != np.uint8:
+        # Tables only cover uint8 levels
+        for alg in algs:
+            image = to_uint8(alg["function"](image, **alg.get("params", {})))
+        return image
+
+    compiler = LUTCompiler(image, stats)
+    pending = []
+    for alg in algs:
+        if capabilities(alg["name"])["channels"] == "to_gray" and image.ndim == 3:
+            if pending:
+                image = compiler.apply()
+                in_place = True
+            image = to_uint8(alg["function"](image, **alg.get("params", {})))
+            compiler = LUTCompiler(image)
+            pending = []
+        else:
+            compiler.add(alg["name"], **alg.get("params", {}))
+            pending.append(alg)
+
+    if not pending:
+        return image
+    if in_place and all(capabilities(alg["name"])["in_place"] for alg in pending):
+        return compiler.apply(out=image)
+    return compiler.apply()
+
+def working_mode(mode: str) -> str:
+    """Mode the algorithms work on for an input Image mode: 'L' or 'RGB'"""
+    return 'L' if mode in SINGLE_CHANNEL_MODES else 'RGB'
+
+def repeats_channel(image: np.ndarray) -> bool:
+    """Whether a 3-channel array is one channel repeated, like a grayscale scan saved as RGB"""
+    return (image.ndim == 3 and image.shape[2] == 3
+            and np.array_equal(image[..., 0], image[..., 1]) and np.array_equal(image[..., 0], image[..., 2]))
+
+def to_uint8(result) -> np.ndarray:
+    """Normalise an algorithm result to a uint8 array, as the executor does between steps"""
+    copies.record("to_uint8", 2)
+    return np.clip(np.asarray(result), 0, 255).astype(np.uint8)
+
+def as_uint8_array(result, dtype: str = "any") -> np.ndarray:
+    """
+    Make a spatial result a contiguous uint8 array, converting only what is needed
+    Args:
+        result: Algorithm output
+        dtype: The algorithm's declared result type
+    """
+    if dtype == "PIL" or isinstance(result, Image.Image):
+        copies.record("from_pil")
+        result = np.asarray(result)
+    if result.dtype != np.uint8:
+        result = to_uint8(result)
+    if not result.flags.c_contiguous:
+        copies.record("contiguous")
+        result = np.ascontiguousarray(result)
+    return result
+
+def apply_frequency_filters(algs: List[Dict], freq_data):
+    """
+    Apply a run of frequency filters with a single spectrum multiply
+    Args:
+        algs: Frequency filter entries, in sequence order
+        freq_data: Full or half-plane spectrum from FourierTransform
+    Returns:
+        numpy.ndarray: Filtered frequency domain data
+    """
+    if len(algs) == 1:
+        return algs[0]["function"](freq_data, **algs[0].get("params", {}))
+
+    H = combined_transfer_function([(alg["name"], alg.get("params", {})) for alg in algs], freq_data)
+    return freq_data * H
+
+def run_sequence(image, sequence: List[Dict],
+                 progress: Optional[Callable[[float, str], None]] = None,
+                 show_spectrum: Optional[Callable[[np.ndarray], None]] = None,
+                 cache: Optional[StepCache] = None, input_key: Optional[str] = None,
+                 cancel: Optional[threading.Event] = None, profile: Optional[RunProfile] = None,
+                 buffers: Optional[BufferPool] = None, single_channel: bool = False,
+                 statistics: Optional[Callable[[ImageStats], None]] = None):
+    """
+    Apply an algorithm sequence to an image
+    Args:
+        image: Input PIL Image or numpy array
+        sequence: Algorithm entries with "name", "function" and "params"
+        progress: Called with (fraction, status) before each step
+        show_spectrum: Called with a uint8 magnitude spectrum whenever the
+                       frequency domain data changes
+        cache: Intermediate results to resume from and to fill, so only the
+               steps from the first changed one onwards are recomputed
+        input_key: Identity of the input image for the cache (default: a
+                   hash of its pixels)
+        cancel: Checked before each step; once set, the run stops
+        profile: Receives the timings, shapes and conversion overhead of each step
+        buffers: Pool of the out= buffers of the steps (default: buffer_pool)
+        single_channel: Work on one channel when the input is RGB with three
+                        identical channels; the result is then single-channel
+        statistics: Called with the ImageStats of the result, whose histograms,
+                    percentiles and ranges are computed on first use
+    Returns:
+        PIL.Image: Processed image
+    Raises:
+        SequenceError: If a step is out of order or fails
+        SequenceCancelled: If cancel was set before the run finished
+    """
+    processed_image = image
+    total_steps = len(sequence)
+    steps = plan_sequence(sequence)
+
+    # Track if we're in frequency domain
+    in_frequency_domain = False
+
+    # Whether processed_image is a private buffer the executor may overwrite
+    owned = False
+
+    # Statistics of processed_image, shared by every step and display that needs them
+    stats = None
+
+    # The executor-owned uint8 buffer processed_image lives in
+    if buffers is None:
+        buffers = buffer_pool
+    pooled = None
+
+    keys = []
+    start = 0
+    if cache is not None:
+        key = input_key if input_key is not None else image_key(image)
+        if single_channel:
+            key += "/single-channel"
+        for step in steps:
+            key = step_key(key, step)
+            keys.append(key)
+
+        # Resume after the last step whose output is still cached
+        for index in range(len(steps) - 1, -1, -1):
+            cached = cache.get(keys[index])
+            if cached is not None:
+                processed_image, in_frequency_domain = cached
+                stats = cache.statistics(keys[index]) or ImageStats(processed_image)
+                start = index + 1
+                if profile is not None:
+                    for cached_step in steps[:index]:
+                        profile.cached(" + ".join(a["name"] for a in cached_step))
+                    profile.cached(" + ".join(a["name"] for a in steps[index]), processed_image)
+                if in_frequency_domain and show_spectrum:
+                    show_spectrum(stats.spectrum())
+                break
+
+    done = sum(len(step) for step in steps[:start])
+    for index, step in enumerate(steps[start:], start):
+        if cancel is not None and cancel.is_set():
+            raise SequenceCancelled()
+
+        alg = step[0]
+        name = " + ".join(a["name"] for a in step)
+
+        # Update progress
+        if progress:
+            progress(done / total_steps, f"Applying {name}...")
+        done += len(step)
+
+        timer = profile.step(name) if profile is not None else NULL_TIMER
+        try:
+            # Convert at the edge only, with the single copy out of PIL; the array
+            # is read-only, so the first in-place step allocates instead.
+            # Single-channel modes stay (H, W) arrays for the whole sequence.
+            with timer.phase("convert_in"):
+                if isinstance(processed_image, Image.Image):
+                    mode = working_mode(processed_image.mode)
+                    if processed_image.mode != mode:
+                        copies.record("convert_mode")
+                        processed_image = processed_image.convert(mode)
+                    copies.record("from_pil")
+                    processed_image = np.asarray(processed_image)
+                if single_channel and index == 0 and repeats_channel(processed_image):
+                    copies.record("single_channel")
+                    processed_image = np.ascontiguousarray(processed_image[..., 0])
+            if stats is None or stats.image is not processed_image:
+                stats = ImageStats(processed_image)
+            timer.input(processed_image)
+
+            caps = capabilities(alg["name"])
+            step_input = processed_image
+            with timer.phase("compute"):
+                # Apply the algorithm with parameters
+                if caps["domain"] == "to_frequency":
+                    # Convert to grayscale if needed
+                    if caps["channels"] == "gray" and processed_image.ndim == 3:
+                        processed_image = np.dot(processed_image[..., :3], [0.2989, 0.5870, 0.1140])
+
+                    # The input is real, so keep only the half-plane spectrum
+                    spectrum_image, freq_data = alg["function"](processed_image, half_spectrum=True,
+                                                                **alg.get("params", {}))
+                    processed_image = freq_data  # Store frequency domain data
+                    in_frequency_domain = True
+                    stats = ImageStats(freq_data, spectrum=spectrum_image)
+
+                    # Update display with magnitude spectrum
+                    if show_spectrum:
+                        show_spectrum(spectrum_image)
+
+                elif caps["domain"] == "to_spatial":
+                    if not in_frequency_domain:
+                        raise SequenceError(f"Error: Must apply Fourier Transform before {alg['name']}")
+                    processed_image = alg["function"](processed_image)  # Get spatial domain image
+                    in_frequency_domain = False
+
+                elif alg["name"] in POINT_OPERATIONS and not in_frequency_domain:
+                    # Fuse the whole run into one table lookup, in place if the buffer is ours
+                    processed_image = apply_point_operations(step, processed_image, in_place=owned, stats=stats)
+
+                elif caps["domain"] == "frequency" and not in_frequency_domain:
+                    # Outside the frequency domain only filters with their own FFT can run
+                    for spatial_alg in step:
+                        if not capabilities(spatial_alg["name"])["spatial_fallback"]:
+                            raise SequenceError(f"Error: Must apply Fourier Transform before {spatial_alg['name']}")
+                        processed_image = spatial_alg["function"](processed_image, **spatial_alg.get("params", {}))
+
+                elif caps["domain"] == "frequency":
+                    # Apply the whole run of filters to frequency domain data at once
+                    processed_image = apply_frequency_filters(step, processed_image)  # Keep in frequency domain
+                    stats = ImageStats(processed_image)
+
+                    # Update display with new magnitude spectrum, once per run
+                    if show_spectrum:
+                        show_spectrum(stats.spectrum())
+
+                else:
+                    if in_frequency_domain:
+                        raise SequenceError(f"Error: Must apply Inverse Fourier Transform before {alg['name']}")
+                    params = alg.get("params", {})
+                    if caps["stats"]:
+                        params = dict(params, stats=stats)
+                    if caps["out"] and processed_image.dtype == np.uint8:
+                        # Write over a private input if allowed, else into a pooled buffer
+                        if owned and caps["in_place"]:
+                            out = processed_image
+                        else:
+                            out = buffers.acquire(processed_image.shape, np.uint8)
+                        processed_image = alg["function"](processed_image, out=out, **params)
+                        if processed_image is not out:
+                            buffers.release(out)
+                    else:
+                        processed_image = alg["function"](processed_image, **params)
+            timer.output(processed_image)
+
+            # Keep spatial results as contiguous uint8 arrays, normalising only what needs it
+            with timer.phase("convert_out"):
+                if not in_frequency_domain:
+                    processed_image = as_uint8_array(processed_image, caps["dtype"])
+
+            # Statistics follow the data: a rewritten buffer forgets them, a new one starts afresh
+            if processed_image is step_input:
+                stats.invalidate()
+            elif stats.image is not processed_image:
+                stats = ImageStats(processed_image)
+
+            if cache is not None:
+                cache.put(keys[index], processed_image, in_frequency_domain, stats)
+
+            # A new (or rewritten private), writable result may be overwritten by later in-place steps
+            owned = ((owned or processed_image is not step_input) and isinstance(processed_image, np.ndarray)
+                     and processed_image.flags.writeable)
+
+            # Results the executor allocated go back to the pool once superseded;
+            # cached results are read-only and are left to the cache
+            if pooled is not None and not np.may_share_memory(processed_image, pooled):
+                buffers.release(pooled)
+                pooled = None
+            if (pooled is None and processed_image is not image and isinstance(processed_image, np.ndarray)
+                    and processed_image.dtype == np.uint8 and processed_image.base is None):
+                pooled = processed_image
+
+        except SequenceError:
+            raise
+        except Exception as e:
+            raise SequenceError(f"Error applying {name}: {str(e)}") from e
+        finally:
+            timer.finish()
+
+    # Convert at the edge only: the result leaves as a PIL Image
+    timer = profile.step("Convert output") if profile is not None else NULL_TIMER
+    timer.input(processed_image)
+    try:
+        with timer.phase("convert_out"):
+            if in_frequency_domain:
+                # A sequence left in the frequency domain shows its magnitude spectrum,
+                # already computed if it was displayed
+                stats = ImageStats(stats.spectrum())
+                processed_image = Image.fromarray(stats.image)
+            elif isinstance(processed_image, np.ndarray):
+                # Pillow shares single-channel arrays with the Image and copies RGB ones,
+                # whose buffer can then go back to the pool unless the statistics keep it
+                copied = processed_image.ndim == 3 and processed_image.shape[2] == 3
+                if copied:
+                    copies.record("to_pil")
+                processed_image = Image.fromarray(processed_image)
+                if copied and pooled is not None and statistics is None:
+                    buffers.release(pooled)
+        timer.output(processed_image)
+    except Exception as e:
+        raise SequenceError(f"Error converting the result: {str(e)}") from e
+    finally:
+        timer.finish()
+
+    if statistics is not None:
+        statistics(stats if stats is not None else ImageStats(np.asarray(processed_image)))
+    return processed_image
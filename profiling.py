@@ -0,0 +1,219 @@
+"""
+Per-step timing of sequence runs
+
+run_sequence fills a RunProfile with one record per execution step: wall and
+CPU time of the algorithm itself, the time spent converting between PIL
+Images and arrays on either side of it, and the shape and dtype flowing in
+and out. CPU time is that of the thread running the sequence, so runs on
+other threads (a cancelled preview, an export) are not charged to it; work
+an algorithm hands to its own thread pool (noise blocks, filter channels)
+shows in the wall time only. Profiles export as JSON or as Chrome trace events (load the file
+in chrome://tracing or https://ui.perfetto.dev).
+
+In debug mode (IMPROCESS_DEBUG_COPIES set, or inside copies.counting()) the
+executor and the algorithms also count the full-image copies the data path
+makes (see bench/bench_copies.py).
+"""
+import json
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, List
+
+import numpy as np
+from PIL import Image
+
+# Phases timed inside a step, in execution order
+PHASES = ("convert_in", "compute", "convert_out")
+
+
+def describe(data) -> Dict:
+    """Shape and dtype of an array, or the equivalent for a PIL Image"""
+    if isinstance(data, Image.Image):
+        bands = len(data.getbands())
+        shape = (data.height, data.width) if bands == 1 else (data.height, data.width, bands)
+        return {"shape": list(shape), "dtype": f"PIL {data.mode}"}
+    data = np.asarray(data)
+    return {"shape": list(data.shape), "dtype": str(data.dtype)}
+
+
+class StepTimer:
+    """Collects the phases of one step into a record of its RunProfile"""
+
+    def __init__(self, profile, name):
+        self.profile = profile
+        self.record = {
+            "name": name,
+            "start_s": time.perf_counter() - profile.origin,
+            "phase_start_s": {},
+            "cached": False,
+            "wall_s": {phase: 0.0 for phase in PHASES},
+            "cpu_s": {phase: 0.0 for phase in PHASES},
+            "input": None,
+            "output": None,
+        }
+
+    @contextmanager
+    def phase(self, phase):
+        # Each run executes on its own thread, whose CPU clock other runs do not advance
+        wall, cpu = time.perf_counter(), time.thread_time()
+        self.record["phase_start_s"].setdefault(phase, wall - self.profile.origin)
+        try:
+            yield
+        finally:
+            self.record["wall_s"][phase] += time.perf_counter() - wall
+            self.record["cpu_s"][phase] += time.thread_time() - cpu
+
+    def input(self, data):
+        self.record["input"] = describe(data)
+
+    def output(self, data):
+        self.record["output"] = describe(data)
+
+    def finish(self):
+        self.profile.add(self.record)
+
+
+class _NullTimer:
+    """Stands in for StepTimer when a run is not profiled"""
+
+    @contextmanager
+    def phase(self, phase):
+        yield
+
+    def input(self, data):
+        pass
+
+    def output(self, data):
+        pass
+
+    def finish(self):
+        pass
+
+
+NULL_TIMER = _NullTimer()
+
+
+class CopyCounter:
+    """
+    Counts full-image copies by site, when enabled
+    The executor records its conversions between steps; the algorithms record
+    their conversion sites (dtype casts, duplicated or padded images, PIL
+    round trips) under "<algorithm>.<kind>". Arithmetic temporaries and the
+    buffers results are computed into are not counted.
+    Args:
+        enabled: Start counting immediately (default: False)
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.sites = Counter()
+        self._lock = threading.Lock()
+
+    @property
+    def total(self) -> int:
+        return sum(self.sites.values())
+
+    def record(self, site, count=1):
+        """Count copies made at a site of the data path"""
+        if self.enabled:
+            with self._lock:
+                self.sites[site] += count
+
+    def reset(self):
+        with self._lock:
+            self.sites.clear()
+
+    @contextmanager
+    def counting(self):
+        """Count from zero for the duration of a with block"""
+        previous = self.enabled
+        self.reset()
+        self.enabled = True
+        try:
+            yield self
+        finally:
+            self.enabled = previous
+
+
+# Copy counter of the executor, enabled in debug mode
+copies = CopyCounter(enabled=bool(os.environ.get("IMPROCESS_DEBUG_COPIES")))
+
+
+class RunProfile:
+    """
+    Timings of one sequence run
+    Attributes:
+        steps: One record per execution step, in order
+    """
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.steps: List[Dict] = []
+        self._lock = threading.Lock()
+
+    def step(self, name) -> StepTimer:
+        """Start timing a step; call finish() on the result when it is done"""
+        return StepTimer(self, name)
+
+    def cached(self, name, data=None):
+        """Record a step whose result came from the step cache"""
+        timer = StepTimer(self, name)
+        timer.record["cached"] = True
+        if data is not None:
+            timer.output(data)
+        timer.finish()
+
+    def add(self, record):
+        with self._lock:
+            self.steps.append(record)
+
+    def total(self, phase=None, clock="wall_s") -> float:
+        """Sum of one phase, or of all phases, over the steps"""
+        phases = [phase] if phase else PHASES
+        return sum(step[clock][p] for step in self.steps for p in phases)
+
+    def summary(self) -> str:
+        """Per-step breakdown as a fixed-width text table"""
+        lines = [f"{'step':<36} {'wall ms':>9} {'cpu ms':>9} {'conv ms':>9}  {'in':<18} {'out':<18}"]
+        for step in self.steps:
+            shapes = ["x".join(map(str, io["shape"])) + f" {io['dtype']}" if io else "-"
+                      for io in (step["input"], step["output"])]
+            if step["cached"]:
+                lines.append(f"{step['name']:<36} {'cached':>9} {'':>9} {'':>9}  {'-':<18} {shapes[1]:<18}")
+                continue
+            conversion = step["wall_s"]["convert_in"] + step["wall_s"]["convert_out"]
+            lines.append(f"{step['name']:<36} {step['wall_s']['compute'] * 1e3:>9.2f} "
+                         f"{step['cpu_s']['compute'] * 1e3:>9.2f} {conversion * 1e3:>9.2f}  "
+                         f"{shapes[0]:<18} {shapes[1]:<18}")
+
+        compute = self.total("compute")
+        conversion = self.total("convert_in") + self.total("convert_out")
+        lines.append(f"{'total':<36} {compute * 1e3:>9.2f} {self.total('compute', 'cpu_s') * 1e3:>9.2f} "
+                     f"{conversion * 1e3:>9.2f}")
+        return "\n".join(lines)
+
+    def to_json(self) -> str:
+        return json.dumps({"steps": self.steps}, indent=2)
+
+    def to_chrome_trace(self) -> str:
+        """Trace-event JSON with one complete event per phase of each step"""
+        events = []
+        for index, step in enumerate(self.steps):
+            for phase in PHASES:
+                duration = step["wall_s"][phase]
+                if phase in step["phase_start_s"]:
+                    events.append({
+                        "name": step["name"] if phase == "compute" else f"{step['name']} ({phase})",
+                        "cat": phase,
+                        "ph": "X",
+                        "ts": step["phase_start_s"][phase] * 1e6,
+                        "dur": duration * 1e6,
+                        "pid": 1,
+                        "tid": 1,
+                        "args": {"step": index, "cpu_ms": step["cpu_s"][phase] * 1e3,
+                                 "input": step["input"], "output": step["output"]},
+                    })
+        return json.dumps({"traceEvents": events, "displayTimeUnit": "ms"})
@@ -0,0 +1,474 @@
+"""
+Tiled, out-of-core execution of algorithm sequences
+
+Large images are processed in tiles read with enough surrounding context (the
+halo) for every step, and written into memory-mapped .npy arrays, so only a
+few tiles are ever widened to float at once. Image files stored as raw rows
+are read a band of rows at a time, other files are decoded once into a raw
+cache (see _ImageSource), and results are written to PNG, TIFF and PNM files
+a band at a time (save_result).
+
+Each algorithm declares its spatial footprint in FOOTPRINTS: the number of
+neighbouring pixels an output pixel depends on along each axis. Consecutive
+local steps run together on one tile, with their footprints added up to form
+the halo, so no intermediate image is written between them.
+
+Global steps (footprint GLOBAL) need the whole image:
+    * Histogram-driven point operations (ContrastStretching, Histogram) use two passes:
+      the first accumulates per-channel histograms over all tiles, the second
+      applies the resulting lookup table tile by tile.
+    * Everything else (the Fourier pipeline from FourierTransform through
+      InverseFourierTransform, HistogramEqualization and unknown
+      algorithms) falls back to loading the memory-mapped intermediate and
+      running the steps on the whole image with pipeline.run_sequence. Peak
+      memory for these steps is that of the in-memory executor.
+"""
+import os
+import struct
+import tempfile
+import zlib
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+from PIL import Image
+
+from alg._histogram import channel_histograms
+from alg._lut import HISTOGRAM_OPERATIONS, POINT_OPERATIONS
+from alg._noise import draw_seed
+from pipeline import SequenceError, capabilities, run_sequence, to_uint8, working_mode
+
+# Footprint of steps that need the whole image
+GLOBAL = None
+
+DEFAULT_TILE_SIZE = 1024
+
+
+def _kernel_radius(size=3):
+    return size // 2
+
+def _weight_radius(kernel=None):
+    return 1 if kernel is None else max(np.shape(kernel)) // 2
+
+# Context pixels each algorithm needs on every side of an output pixel, either
+# fixed or computed from the parameters; algorithms not listed are GLOBAL
+FOOTPRINTS = {
+    "Brightness": 0,
+    "Negative": 0,
+    "GammaCorrection": 0,
+    "Rgb2Gray": 0,
+    "Gray2Binary": 0,
+    "RGB2Binary": 0,
+    "GaussianNoise": 0,
+    "SaltAndPepperNoise": 0,
+    "UniformNoise": 0,
+    "RayleighNoise": 0,
+    "GammaNoise": 0,
+    "ExponentialNoise": 0,
+    "MeanFilter": _kernel_radius,
+    "MedianFilter": _kernel_radius,
+    "MaxFilter": _kernel_radius,
+    "MinFilter": _kernel_radius,
+    "MidPointFilter": _kernel_radius,
+    "WeightFilter": _weight_radius,
+    "PointSharpening": 1,
+    "SobelEdgeDetection": 1,
+    "RobertsEdgeDetection": 1,
+}
+
+
+def footprint(alg: Dict) -> Optional[int]:
+    """Footprint of one algorithm entry, or GLOBAL"""
+    value = FOOTPRINTS.get(alg["name"], GLOBAL)
+    if callable(value):
+        value = value(**alg.get("params", {}))
+    return value
+
+def plan_stages(sequence: List[Dict]) -> List[tuple]:
+    """
+    Split a sequence into tiled stages
+    Returns:
+        list: (kind, algs) pairs, kind being "local", "histogram" or "global"
+    """
+    stages = []
+    in_frequency_domain = False
+    for alg in sequence:
+        if in_frequency_domain or alg["name"] == "FourierTransform":
+            # Keep a whole Fourier section together so the executor can check it
+            kind = "global"
+            in_frequency_domain = alg["name"] != "InverseFourierTransform"
+        elif alg["name"] in HISTOGRAM_OPERATIONS:
+            kind = "histogram"
+        elif footprint(alg) is GLOBAL:
+            kind = "global"
+        else:
+            kind = "local"
+
+        if kind != "histogram" and stages and stages[-1][0] == kind:
+            stages[-1][1].append(alg)
+        else:
+            stages.append((kind, [alg]))
+    return stages
+
+
+# Raw modes whose rows are read straight from the file: bytes per pixel and
+# the channels that make up the working mode ('L' or 'RGB')
+_RAW_PIXELS = {
+    'L': (1, 0),
+    'LA': (2, 0),
+    'RGB': (3, slice(0, 3)),
+    'RGBX': (4, slice(0, 3)),
+    'RGBA': (4, slice(0, 3)),
+    'BGR': (3, [2, 1, 0]),
+    'BGRX': (4, [2, 1, 0]),
+    'BGRA': (4, [2, 1, 0]),
+}
+
+
+class _ImageSource:
+    """
+    Read-only, sliceable view of an image file that reads row bands on demand
+    Files whose pixels are stored as uncompressed 8-bit rows (BMP, PPM/PGM,
+    uncompressed TIFF, in one block or in strips) are read a band of rows at
+    a time with plain file reads, at the offsets listed in Pillow's tile
+    descriptors. Any other file is decoded once by Pillow, converted band by
+    band into a raw cache file in cache_dir, and released; bands are then
+    read back from the cache the same way.
+    """
+
+    # Rows converted at a time when filling the cache
+    CACHE_BAND_ROWS = 256
+
+    def __init__(self, path, cache_dir=None):
+        with Image.open(path) as image:
+            self.mode = working_mode(image.mode)
+            width, height = image.size
+            self.shape = (height, width) if self.mode == 'L' else (height, width, 3)
+            layout = self._raw_layout(image)
+            if layout is not None:
+                self._file = open(path, 'rb')
+            else:
+                self._file = self._decode_to_cache(image, cache_dir)
+                # The cache holds rows of the working mode, top-down and unpadded
+                rawmode = self.mode
+                bytes_per_pixel, _ = _RAW_PIXELS[rawmode]
+                layout = rawmode, [(0, height, 0, width * bytes_per_pixel, 1)]
+
+        rawmode, self._strips = layout
+        self._bytes_per_pixel, self._channels = _RAW_PIXELS[rawmode]
+
+        # Last read band, (top, bottom, array): the tiles of one row share it
+        self._band = None
+
+    def _raw_layout(self, image):
+        """
+        (rawmode, strips) of a file storing its pixels as raw rows, else None
+        Each strip is (top, bottom, offset, stride, orientation), read off the
+        image's tile descriptors; they are only read, never changed.
+        """
+        width = image.width
+        rawmodes = set()
+        strips = []
+        for name, extents, offset, args in image.tile:
+            # args is the raw mode, optionally followed by the stride and orientation
+            args = (args,) if isinstance(args, str) else tuple(args)
+            if name != 'raw' or extents[0] != 0 or extents[2] != width or args[0] not in _RAW_PIXELS:
+                return None
+            rawmode, stride, orientation = args + (0, 1)[len(args) - 1:]
+            rawmodes.add(rawmode)
+            strips.append((extents[1], extents[3], offset,
+                           stride or width * _RAW_PIXELS[rawmode][0], orientation))
+
+        # One raw mode whose channels give the working mode directly
+        if len(rawmodes) != 1:
+            return None
+        rawmode = rawmodes.pop()
+        if (_RAW_PIXELS[rawmode][0] <= 2) != (self.mode == 'L'):
+            return None
+        return rawmode, strips
+
+    def _decode_to_cache(self, image, cache_dir):
+        # Written and read with plain file I/O, so the cache never stays resident like a mapping
+        cache = tempfile.TemporaryFile(dir=cache_dir)
+        for top in range(0, self.shape[0], self.CACHE_BAND_ROWS):
+            bottom = min(top + self.CACHE_BAND_ROWS, self.shape[0])
+            band = image.crop((0, top, image.width, bottom))
+            cache.write(np.asarray(band if band.mode == self.mode else band.convert(self.mode)).tobytes())
+        return cache
+
+    def _read_rows(self, top, bottom):
+        """Rows [top, bottom) of the image, in the working mode"""
+        band = np.empty((bottom - top,) + self.shape[1:], dtype=np.uint8)
+        row_bytes = self.shape[1] * self._bytes_per_pixel
+        for strip_top, strip_bottom, offset, stride, orientation in self._strips:
+            low, high = max(top, strip_top), min(bottom, strip_bottom)
+            if low >= high:
+                continue
+            # Bottom-up strips store their last row first
+            first = low - strip_top if orientation > 0 else strip_bottom - high
+            self._file.seek(offset + first * stride)
+            rows = np.frombuffer(self._file.read((high - low) * stride), dtype=np.uint8)
+            rows = rows.reshape(high - low, stride)[:, :row_bytes]
+            if orientation < 0:
+                rows = rows[::-1]
+            pixels = rows.reshape(high - low, self.shape[1], self._bytes_per_pixel)
+            band[low - top:high - top] = pixels[..., self._channels]
+        return band
+
+    def __getitem__(self, index):
+        top, bottom, _ = index[0].indices(self.shape[0])
+        left, right, _ = index[1].indices(self.shape[1])
+        if self._band is None or not (self._band[0] <= top and bottom <= self._band[1]):
+            self._band = None
+            self._band = (top, bottom, self._read_rows(top, bottom))
+        first, _, band = self._band
+        return band[top - first:bottom - first, left:right]
+
+
+def open_source(source, cache_dir: Optional[str] = None):
+    """
+    Open a tiled source: an .npy file (memory-mapped), an image file or an array
+    Args:
+        source: Path or array
+        cache_dir: Directory for the decoded copy of image files that cannot be
+                   read in bands (default: system temp)
+    """
+    if isinstance(source, str):
+        if source.lower().endswith('.npy'):
+            return np.load(source, mmap_mode='r')
+        return _ImageSource(source, cache_dir)
+    return np.asarray(source)
+
+def tiles(shape, tile_size: int, halo: int = 0):
+    """
+    Yield (inner, outer) slice pairs covering an image
+    inner is the region written, outer the region read including the halo.
+    """
+    rows, cols = shape[:2]
+    for r0 in range(0, rows, tile_size):
+        for c0 in range(0, cols, tile_size):
+            r1, c1 = min(r0 + tile_size, rows), min(c0 + tile_size, cols)
+            inner = (slice(r0, r1), slice(c0, c1))
+            outer = (slice(max(r0 - halo, 0), min(r1 + halo, rows)),
+                     slice(max(c0 - halo, 0), min(c1 + halo, cols)))
+            yield inner, outer
+
+
+class _Writer:
+    """Creates the memory-mapped output on the first tile, once its channels are known"""
+
+    def __init__(self, path, rows, cols):
+        self.path = path
+        self.rows, self.cols = rows, cols
+        self.array = None
+
+    def write(self, inner, data):
+        if self.array is None:
+            self.array = np.lib.format.open_memmap(
+                self.path, mode='w+', dtype=np.uint8, shape=(self.rows, self.cols) + data.shape[2:])
+        self.array[inner] = data
+
+
+def _run_local(source, algs, writer, tile_size):
+    halo = sum(footprint(alg) for alg in algs)
+
+    # Noise is keyed by pixel position under one seed for the whole stage, so every
+    # tile, halo included, gets the noise the whole image would
+    params = [dict(alg.get("params", {})) for alg in algs]
+    for alg, alg_params in zip(algs, params):
+        if capabilities(alg["name"])["seeded"] and alg_params.get("seed") is None:
+            alg_params["seed"] = draw_seed()
+
+    for inner, outer in tiles(source.shape, tile_size, halo):
+        tile = np.array(source[outer])
+        for alg, alg_params in zip(algs, params):
+            if capabilities(alg["name"])["seeded"]:
+                alg_params = dict(alg_params, origin=(outer[0].start, outer[1].start))
+            tile = to_uint8(alg["function"](tile, **alg_params))
+
+        # Drop the halo, which is only there to make the inner region exact
+        top = inner[0].start - outer[0].start
+        left = inner[1].start - outer[1].start
+        height = inner[0].stop - inner[0].start
+        width = inner[1].stop - inner[1].start
+        writer.write(inner, tile[top:top + height, left:left + width])
+
+def _run_histogram(source, alg, writer, tile_size):
+    # Pass 1: histograms of the whole image, accumulated tile by tile
+    hist = None
+    for inner, _ in tiles(source.shape, tile_size):
+        tile_hist = channel_histograms(np.asarray(source[inner]))
+        hist = tile_hist if hist is None else hist + tile_hist
+
+    # Pass 2: one lookup table per channel, applied tile by tile
+    builder = POINT_OPERATIONS[alg["name"]]
+    tables = [builder(channel_hist, **alg.get("params", {})) for channel_hist in hist]
+    for inner, _ in tiles(source.shape, tile_size):
+        tile = np.asarray(source[inner])
+        if tile.ndim == 2:
+            writer.write(inner, tables[0][tile])
+        else:
+            writer.write(inner, np.stack([tables[c][tile[..., c]] for c in range(tile.shape[2])], axis=-1))
+
+def _run_global(source, algs, writer):
+    # Fallback: the steps see the whole image, exactly like the in-memory executor
+    result = run_sequence(np.array(source[:, :]), algs)
+    writer.write((slice(None), slice(None)), to_uint8(result))
+
+def run_tiled(source, sequence: List[Dict], output: str, tile_size: int = DEFAULT_TILE_SIZE,
+              workdir: Optional[str] = None,
+              progress: Optional[Callable[[float, str], None]] = None) -> np.memmap:
+    """
+    Apply an algorithm sequence tile by tile, writing to a memory-mapped array
+    Args:
+        source: Image file path, .npy path or array
+        sequence: Algorithm entries with "name", "function" and "params"
+        output: Path of the .npy file to create
+        tile_size: Side of the square tiles written per step (default: 1024)
+        workdir: Directory for intermediate .npy files and the decoded copy of
+                 image files that cannot be read in bands (default: system temp)
+        progress: Called with (fraction, status) before each stage
+    Returns:
+        numpy.memmap: uint8 result, backed by the output file
+    Raises:
+        SequenceError: If a step is out of order or fails
+    """
+    stages = plan_stages(sequence)
+
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        current = open_source(source, tmp)
+        rows, cols = current.shape[:2]
+
+        for index, (kind, algs) in enumerate(stages):
+            name = " + ".join(alg["name"] for alg in algs)
+            if progress:
+                progress(index / len(stages), f"Applying {name}...")
+
+            last = index == len(stages) - 1
+            writer = _Writer(output if last else os.path.join(tmp, f"stage{index}.npy"), rows, cols)
+            try:
+                if kind == "local":
+                    _run_local(current, algs, writer, tile_size)
+                elif kind == "histogram":
+                    _run_histogram(current, algs[0], writer, tile_size)
+                else:
+                    _run_global(current, algs, writer)
+            except SequenceError:
+                raise
+            except Exception as e:
+                raise SequenceError(f"Error applying {name}: {str(e)}") from e
+
+            writer.array.flush()
+            current = writer.array
+
+        if not stages:
+            writer = _Writer(output, rows, cols)
+            for inner, _ in tiles(current.shape, tile_size):
+                writer.write(inner, np.asarray(current[inner]))
+            current = writer.array
+
+        # Reopen the result from the output file, outside the temporary directory
+        current.flush()
+        return np.load(output, mmap_mode='r+')
+
+
+def _png_chunk(file, kind, data=b''):
+    file.write(struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data)))
+
+def _write_png(array, file, band_rows):
+    rows, cols = array.shape[:2]
+    color_type = {1: 0, 2: 4, 3: 2, 4: 6}[1 if array.ndim == 2 else array.shape[2]]
+    file.write(b'\x89PNG\r\n\x1a\n')
+    _png_chunk(file, b'IHDR', struct.pack('>IIBBBBB', cols, rows, 8, color_type, 0, 0, 0))
+
+    # Every row is written with the Up filter (difference with the row above),
+    # which only needs the last row of the previous band
+    compressor = zlib.compressobj(6)
+    above = np.zeros(array[0].size, dtype=np.uint8)
+    for top in range(0, rows, band_rows):
+        band = np.asarray(array[top:top + band_rows]).reshape(-1, above.size)
+        filtered = np.empty((band.shape[0], above.size + 1), dtype=np.uint8)
+        filtered[:, 0] = 2
+        np.subtract(band[:1], above, out=filtered[:1, 1:])
+        np.subtract(band[1:], band[:-1], out=filtered[1:, 1:])
+        above = band[-1].copy()
+        data = compressor.compress(filtered)
+        if data:
+            _png_chunk(file, b'IDAT', data)
+    _png_chunk(file, b'IDAT', compressor.flush())
+    _png_chunk(file, b'IEND')
+
+def _write_tiff(array, file, band_rows):
+    rows, cols = array.shape[:2]
+    channels = 1 if array.ndim == 2 else array.shape[2]
+    strip_bytes = band_rows * array[0].nbytes
+    strips = -(-rows // band_rows)
+    data_end = 8 + array.nbytes
+    if data_end + 8 * strips + 2 * channels + 200 >= 2 ** 32:
+        raise ValueError("Image too large for a TIFF file, save it as .png or .npy")
+
+    # Header, the strips, then the strip tables, bits per sample and the directory
+    offsets = np.arange(strips, dtype='<u4') * strip_bytes + 8
+    counts = np.full(strips, strip_bytes, dtype='<u4')
+    counts[-1] = (rows - (strips - 1) * band_rows) * array[0].nbytes
+    bits = np.full(channels, 8, dtype='<u2')
+    directory = data_end + offsets.nbytes + counts.nbytes + bits.nbytes
+    file.write(struct.pack('<2sHI', b'II', 42, directory))
+    for top in range(0, rows, band_rows):
+        file.write(np.ascontiguousarray(array[top:top + band_rows]).tobytes())
+
+    def location(table, start):
+        # Values of up to four bytes are stored in the entry itself
+        return struct.unpack('<I', table.tobytes().ljust(4, b'\0'))[0] if table.nbytes <= 4 else start
+
+    entries = [(256, 4, 1, cols), (257, 4, 1, rows),
+               (258, 3, channels, location(bits, data_end + offsets.nbytes + counts.nbytes)),
+               (259, 3, 1, 1), (262, 3, 1, 2 if channels >= 3 else 1),
+               (273, 4, strips, location(offsets, data_end)), (277, 3, 1, channels),
+               (278, 4, 1, band_rows), (279, 4, strips, location(counts, data_end + offsets.nbytes)),
+               (284, 3, 1, 1)]
+    if channels in (2, 4):
+        # The last channel is unassociated alpha
+        entries.append((338, 3, 1, 2))
+    file.write(offsets.tobytes() + counts.tobytes() + bits.tobytes())
+    file.write(struct.pack('<H', len(entries)))
+    for tag, kind, count, value in entries:
+        file.write(struct.pack('<HHII', tag, kind, count, value))
+    file.write(struct.pack('<I', 0))
+
+def _write_pnm(array, file, band_rows):
+    rows, cols = array.shape[:2]
+    file.write(b'P5' if array.ndim == 2 else b'P6')
+    file.write(f'\n{cols} {rows}\n255\n'.encode())
+    for top in range(0, rows, band_rows):
+        file.write(np.ascontiguousarray(array[top:top + band_rows]).tobytes())
+
+# Writers by extension of the formats that can be written a band of rows at a time;
+# PNM holds grayscale and RGB only
+_BAND_WRITERS = {
+    '.png': _write_png,
+    '.tif': _write_tiff,
+    '.tiff': _write_tiff,
+    '.pgm': _write_pnm,
+    '.ppm': _write_pnm,
+    '.pnm': _write_pnm,
+}
+
+def save_result(array, path: str, band_rows: int = DEFAULT_TILE_SIZE):
+    """
+    Save a (memory-mapped) uint8 result as an image file
+    PNG, uncompressed TIFF and PNM files are written a band of rows at a time,
+    so only a band is ever read into memory; other formats are encoded by
+    Pillow from the whole image.
+    Args:
+        array: 2D, HxWx2, HxWx3 or HxWx4 uint8 array
+        path: Output file; its extension selects the format
+        band_rows: Rows read and written at a time (default: 1024)
+    """
+    writer = _BAND_WRITERS.get(os.path.splitext(path)[1].lower())
+    if writer is _write_pnm and array.ndim == 3 and array.shape[2] != 3:
+        writer = None
+    if writer is None:
+        Image.fromarray(np.asarray(array)).save(path)
+        return
+    with open(path, 'wb') as file:
+        writer(array, file, band_rows)